@@ -8,21 +8,44 @@ through continuous log trailing and multi-agent response generation.
 import asyncio
 import json
 import logging
+import os
+import re
+import sys
 import hashlib
+import gc
+import itertools
 import time
+import math
+import mmap
+import struct
+import zlib
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Set, Tuple
+from typing import Callable, Dict, List, Any, Iterable, Iterator, Optional, Set, Tuple
 from dataclasses import dataclass, field
-from collections import defaultdict, deque
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from collections import defaultdict, deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import threading
+import contextlib
 import multiprocessing
+import queue
 from enum import Enum
+from array import array
 import numpy as np
 from pathlib import Path
 import aiofiles
 import random
 
+# Optional fast JSON backends for log decoding
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configure advanced logging
 logging.basicConfig(
     level=logging.INFO,
@@ -74,6 +97,284 @@ class IntelligencePacket:
             'child_packets': self.child_packets
         }
 
+# ================== Compact Packet Store ==================
+
+FIELD_TYPES_BY_CODE = list(IntelligenceFieldType)
+FIELD_TYPE_CODES = {field_type: code for code, field_type in enumerate(FIELD_TYPES_BY_CODE)}
+
+class PacketStore:
+    """
+    Columnar packet storage for large oceans.
+    Timestamps, confidences and field-type/agent codes live in array-backed columns,
+    parent/child ids are interned tuples (sys.intern) shared with the packets they
+    name, and rows of released packets are reused. Packets are exposed as PacketView.
+    """
+
+    def __init__(self):
+        self.ids: List[Optional[str]] = []
+        self.timestamps = array('d')
+        self.confidences = array('d')
+        self.field_codes = array('B')
+        self.agent_codes = array('H')
+        self.data: List[Optional[Dict[str, Any]]] = []
+        self.parents: List[Tuple[str, ...]] = []
+        self.children: List[Tuple[str, ...]] = []
+        self.agent_names: List[str] = []
+        self.agent_index: Dict[str, int] = {}
+        self.free_rows: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.ids) - len(self.free_rows)
+
+    def append(self, packet: IntelligencePacket) -> 'PacketView':
+        """Copy a packet into the columns and return its view"""
+        agent_code = self.agent_index.get(packet.source_agent)
+        if agent_code is None:
+            agent_code = self.agent_index[packet.source_agent] = len(self.agent_names)
+            self.agent_names.append(packet.source_agent)
+
+        packet_id = sys.intern(packet.id)
+        parents = tuple(sys.intern(p) for p in packet.parent_packets)
+        children = tuple(sys.intern(c) for c in packet.child_packets)
+        values = (packet_id, packet.timestamp, packet.confidence,
+                  FIELD_TYPE_CODES[packet.field_type], agent_code, packet.data, parents, children)
+
+        if self.free_rows:
+            row = self.free_rows.pop()
+            self.write_row(row, values)
+        else:
+            row = len(self.ids)
+            for column, value in zip(self.columns(), values):
+                column.append(value)
+        return PacketView(self, row)
+
+    def release(self, view: 'PacketView'):
+        """
+        Free a view's row for reuse. The view is moved onto a private one-row store
+        first, so anyone still holding an evicted packet keeps seeing its own data.
+        """
+        if view._store is not self:
+            return
+        row = view._row
+        detached = PacketStore()
+        detached.agent_names = self.agent_names
+        detached.agent_index = self.agent_index
+        for column, value in zip(detached.columns(), self.read_row(row)):
+            column.append(value)
+        view._store, view._row = detached, 0
+
+        self.write_row(row, (None, 0.0, 0.0, 0, 0, None, (), ()))
+        self.free_rows.append(row)
+
+    def columns(self) -> Tuple[Any, ...]:
+        return (self.ids, self.timestamps, self.confidences, self.field_codes,
+                self.agent_codes, self.data, self.parents, self.children)
+
+    def read_row(self, row: int) -> Tuple[Any, ...]:
+        return tuple(column[row] for column in self.columns())
+
+    def write_row(self, row: int, values: Tuple[Any, ...]):
+        for column, value in zip(self.columns(), values):
+            column[row] = value
+
+class PacketView:
+    """Lightweight read-only view of one PacketStore row with the IntelligencePacket API"""
+
+    __slots__ = ('_store', '_row')
+
+    vector_embedding = None
+
+    def __init__(self, store: PacketStore, row: int):
+        self._store = store
+        self._row = row
+
+    @property
+    def id(self) -> str:
+        return self._store.ids[self._row]
+
+    @property
+    def timestamp(self) -> float:
+        return self._store.timestamps[self._row]
+
+    @property
+    def source_agent(self) -> str:
+        return self._store.agent_names[self._store.agent_codes[self._row]]
+
+    @property
+    def field_type(self) -> IntelligenceFieldType:
+        return FIELD_TYPES_BY_CODE[self._store.field_codes[self._row]]
+
+    @property
+    def confidence(self) -> float:
+        return self._store.confidences[self._row]
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        return self._store.data[self._row]
+
+    @property
+    def parent_packets(self) -> List[str]:
+        return list(self._store.parents[self._row])
+
+    @property
+    def child_packets(self) -> List[str]:
+        return list(self._store.children[self._row])
+
+    def to_dict(self):
+        return IntelligencePacket.to_dict(self)
+
+    def __repr__(self):
+        return f"PacketView(id={self.id!r}, field_type={self.field_type}, confidence={self.confidence})"
+
+# ================== Incremental Coherence ==================
+
+FIELD_BUCKET_SECONDS = 300   # Width of the time buckets that group packets into fields
+COHERENCE_TIME_SCALE = 60.0  # Time-proximity decays over minutes
+
+def time_coherence(time_diff: float) -> float:
+    """Exact time-proximity kernel used by field coherence"""
+    return 1.0 / (1.0 + time_diff / COHERENCE_TIME_SCALE)
+
+class ExponentialDecayKernel:
+    """
+    Sum-of-exponentials approximation of the time-proximity kernel.
+    1/(1+x) = integral of e^-s * e^-sx ds, so Gauss-Laguerre quadrature turns it into
+    sum(w_k * e^(-s_k * x)). Terms are added until the worst-case kernel error over a
+    field bucket is within `tolerance`, which also bounds the coherence error since
+    coherence averages kernel * mean confidence with confidences in [0, 1].
+    """
+
+    MAX_TERMS = 40
+
+    def __init__(self, tolerance: float = 1e-3, span: float = FIELD_BUCKET_SECONDS,
+                 time_scale: float = COHERENCE_TIME_SCALE):
+        self.tolerance = tolerance
+        self.span = span
+        self.time_scale = time_scale
+
+        grid = np.linspace(0.0, span / time_scale, 2001)
+        exact = 1.0 / (1.0 + grid)
+        for terms in range(2, self.MAX_TERMS + 1, 2):
+            nodes, weights = np.polynomial.laguerre.laggauss(terms)
+            approx = (weights * np.exp(-np.outer(grid, nodes))).sum(axis=1)
+            self.max_error = float(np.abs(approx - exact).max())
+            if self.max_error <= tolerance:
+                break
+
+        self.terms = terms
+        self.rates = nodes / time_scale  # Per-second decay rate of each term
+        self.weights = weights
+
+class IncrementalCoherence:
+    """
+    Running coherence score for a field, updated in O(terms) per packet.
+    For each decay term it keeps the decayed packet count and decayed confidence sum
+    relative to the newest timestamp, so a new packet's contribution against every
+    earlier packet is sum(w_k * (c * S_k + C_k) / 2) after decaying S_k and C_k.
+    """
+
+    __slots__ = ('kernel', 'decayed_counts', 'decayed_confidences', 'reference_time',
+                 'packet_count', 'total_coherence', 'comparisons', 'out_of_order')
+
+    def __init__(self, kernel: ExponentialDecayKernel):
+        self.kernel = kernel
+        self.decayed_counts = np.zeros(kernel.terms)
+        self.decayed_confidences = np.zeros(kernel.terms)
+        self.reference_time: Optional[float] = None
+        self.packet_count = 0
+        self.total_coherence = 0.0
+        self.comparisons = 0
+        self.out_of_order = 0
+
+    def add(self, timestamp: float, confidence: float, earlier_packets: List['IntelligencePacket']):
+        """Fold a new packet into the running sums"""
+        if self.reference_time is None:
+            self.reference_time = timestamp
+        elif timestamp >= self.reference_time:
+            decay = np.exp(-self.kernel.rates * (timestamp - self.reference_time))
+            self.decayed_counts *= decay
+            self.decayed_confidences *= decay
+            self.reference_time = timestamp
+            self.total_coherence += float(np.dot(
+                self.kernel.weights,
+                confidence * self.decayed_counts + self.decayed_confidences
+            )) / 2
+        else:
+            # Late packet: score it exactly against the field, then fold it in
+            # with its weight relative to the current reference time
+            self.out_of_order += 1
+            for other in earlier_packets:
+                self.total_coherence += (time_coherence(abs(timestamp - other.timestamp))
+                                         * (confidence + other.confidence) / 2)
+
+        weight = np.exp(-self.kernel.rates * (self.reference_time - timestamp))
+        self.decayed_counts += weight
+        self.decayed_confidences += confidence * weight
+        self.comparisons += self.packet_count
+        self.packet_count += 1
+
+    def extend(self, packets: List['IntelligencePacket'], start: int = 0):
+        """
+        Fold packets[start:] in as repeated add() calls would, but vectorized over each
+        run of non-decreasing timestamps; late packets still take the exact path.
+        """
+        timestamps = np.fromiter((p.timestamp for p in packets[start:]), dtype=np.float64)
+        confidences = np.fromiter((p.confidence for p in packets[start:]), dtype=np.float64)
+        breaks = np.flatnonzero(np.diff(timestamps) < 0) + 1
+        
+        i, count = 0, len(timestamps)
+        while i < count:
+            if self.reference_time is not None and timestamps[i] < self.reference_time:
+                self.add(timestamps[i], confidences[i], packets[:start + i])
+                i += 1
+                continue
+            run_end = breaks[np.searchsorted(breaks, i, side='right')] \
+                if len(breaks) and breaks[-1] > i else count
+            self.add_run(timestamps[i:run_end], confidences[i:run_end])
+            i = run_end
+    
+    RUN_ROWS = 1 << 15        # Rows per vectorized block, bounding the (rows x terms) temporaries
+    RUN_EXPONENT_LIMIT = 600  # Largest rate * time span per block, far from float64 overflow
+    
+    def add_run(self, timestamps: np.ndarray, confidences: np.ndarray):
+        """Fold in packets with non-decreasing timestamps, none older than the reference time"""
+        rates, weights = self.kernel.rates, self.kernel.weights
+        max_span = self.RUN_EXPONENT_LIMIT / rates.max()
+        
+        start = 0
+        while start < len(timestamps):
+            origin = timestamps[start]
+            stop = min(int(np.searchsorted(timestamps, origin + max_span, side='right')),
+                       start + self.RUN_ROWS, len(timestamps))
+            times, confs = timestamps[start:stop], confidences[start:stop]
+            if self.reference_time is None:
+                self.reference_time = origin
+            
+            # Growth relative to the block origin (>= 1) and decay of the carried sums
+            growth = np.exp(np.outer(times - origin, rates))
+            carried = np.exp(-np.outer(times - self.reference_time, rates))
+            earlier_counts = np.vstack((np.zeros(len(rates)), np.cumsum(growth, axis=0)[:-1]))
+            earlier_confs = np.vstack((np.zeros(len(rates)),
+                                       np.cumsum(confs[:, None] * growth, axis=0)[:-1]))
+            counts = earlier_counts / growth + self.decayed_counts * carried
+            confidence_sums = earlier_confs / growth + self.decayed_confidences * carried
+            self.total_coherence += float(
+                ((confs[:, None] * counts + confidence_sums) @ weights).sum()) / 2
+            
+            rows = len(times)
+            self.decayed_counts = counts[-1] + 1.0
+            self.decayed_confidences = confidence_sums[-1] + confs[-1]
+            self.reference_time = float(times[-1])
+            self.comparisons += rows * self.packet_count + rows * (rows - 1) // 2
+            self.packet_count += rows
+            start = stop
+
+    @property
+    def score(self) -> float:
+        if self.packet_count < 2:
+            return 1.0
+        return self.total_coherence / self.comparisons
+
 @dataclass
 class IntelligenceField:
     """A field of related intelligence packets forming knowledge domains"""
@@ -84,15 +385,80 @@ class IntelligenceField:
     coherence_score: float = 0.0  # How well packets relate
     emergence_patterns: Dict[str, Any] = field(default_factory=dict)
     field_vector: Optional[np.ndarray] = None
-    
+    coherence_tracker: Optional[IncrementalCoherence] = field(default=None, repr=False)
+    key_counts: Dict[str, int] = field(default_factory=lambda: defaultdict(int), repr=False)
+    emergence_delta: Dict[str, List[str]] = field(
+        default_factory=lambda: {'emerged': [], 'subsided': []}, repr=False)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    removed: bool = field(default=False, repr=False, compare=False)  # Set once evicted from the ocean
+    window_key: Optional[Tuple[int, int]] = field(default=None, repr=False)  # Key in the ocean's field map
+
+    def snapshot(self) -> 'FieldSnapshot':
+        """Immutable copy of the reader-facing state (pattern dicts are replaced, never mutated)"""
+        return FieldSnapshot(
+            field_id=self.field_id,
+            field_type=self.field_type,
+            coherence_score=self.coherence_score,
+            packet_count=len(self.packets),
+            emergence_patterns=self.emergence_patterns,
+            emergence_delta=self.emergence_delta
+        )
+
     def add_packet(self, packet: IntelligencePacket):
-        """Add packet and recalculate field coherence"""
-        self.packets.append(packet)
-        self.recalculate_coherence()
+        """Add packet and update field coherence"""
+        self.absorb(packet)
         self.detect_emergence()
-    
+
+    def extend(self, packets: List[IntelligencePacket]):
+        """Bulk add in arrival order, refreshing coherence and emergence once"""
+        start = len(self.packets)
+        self.packets.extend(packets)
+        for packet in packets:
+            for key in packet.data:
+                self.key_counts[key] += 1
+        
+        if self.coherence_tracker is not None:
+            self.coherence_tracker.extend(self.packets, start)
+            self.coherence_score = self.coherence_tracker.score
+        else:
+            self.recalculate_coherence()
+        self.detect_emergence()
+
+    def absorb(self, packet: IntelligencePacket):
+        """Add a packet to the coherence and key counters without refreshing emergence"""
+        if self.coherence_tracker is not None:
+            self.coherence_tracker.add(packet.timestamp, packet.confidence, self.packets)
+            self.packets.append(packet)
+            self.coherence_score = self.coherence_tracker.score
+        else:
+            self.packets.append(packet)
+            self.recalculate_coherence()
+
+        for key in packet.data:
+            self.key_counts[key] += 1
+
+    def evict_oldest(self, count: int) -> List[IntelligencePacket]:
+        """Drop the oldest packets, then refresh coherence and emergence for the rest"""
+        evicted = self.packets[:count]
+        del self.packets[:count]
+        for packet in evicted:
+            for key in packet.data:
+                self.key_counts[key] -= 1
+                if self.key_counts[key] <= 0:
+                    del self.key_counts[key]
+        
+        # The running sums cannot subtract packets, so refold the survivors
+        if self.coherence_tracker is not None:
+            self.coherence_tracker = IncrementalCoherence(self.coherence_tracker.kernel)
+            self.coherence_tracker.extend(self.packets)
+            self.coherence_score = self.coherence_tracker.score
+        else:
+            self.recalculate_coherence()
+        self.detect_emergence(min_packets=0)
+        return evicted
+
     def recalculate_coherence(self):
-        """Calculate how well packets in this field relate to each other"""
+        """Calculate how well packets in this field relate to each other (exact, O(n^2))"""
         if len(self.packets) < 2:
             self.coherence_score = 1.0
             return
@@ -103,64 +469,521 @@ class IntelligenceField:
         
         for i, p1 in enumerate(self.packets):
             for p2 in self.packets[i+1:]:
-                time_diff = abs(p1.timestamp - p2.timestamp)
-                time_coherence = 1.0 / (1.0 + time_diff / 60)  # Decay over minutes
+                proximity = time_coherence(abs(p1.timestamp - p2.timestamp))
                 confidence_coherence = (p1.confidence + p2.confidence) / 2
-                total_coherence += time_coherence * confidence_coherence
+                total_coherence += proximity * confidence_coherence
                 comparisons += 1
         
         self.coherence_score = total_coherence / comparisons if comparisons > 0 else 0.0
     
-    def detect_emergence(self):
-        """Detect emergent patterns in the field"""
-        if len(self.packets) < 3:
+    def detect_emergence(self, min_packets: int = 3):
+        """Detect emergent patterns in the field from the running key counters"""
+        if len(self.packets) < min_packets:
             return
         
-        # Look for patterns in packet data
-        pattern_counts = defaultdict(int)
-        for packet in self.packets:
-            for key in packet.data:
-                pattern_counts[key] += 1
-        
         # Patterns that appear in >50% of packets are emergent
         threshold = len(self.packets) * 0.5
+        previous = self.emergence_patterns
         self.emergence_patterns = {
-            k: v for k, v in pattern_counts.items() 
+            k: v for k, v in self.key_counts.items()
             if v >= threshold
         }
+        self.emergence_delta = {
+            'emerged': [k for k in self.emergence_patterns if k not in previous],
+            'subsided': [k for k in previous if k not in self.emergence_patterns]
+        }
+
+@dataclass(frozen=True)
+class FieldSnapshot:
+    """A field's state as published after its last update, read without locks"""
+    field_id: str
+    field_type: IntelligenceFieldType
+    coherence_score: float
+    packet_count: int
+    emergence_patterns: Dict[str, Any]
+    emergence_delta: Dict[str, List[str]]
+
+# ================== Streaming Statistics ==================
+
+class RollingStats:
+    """
+    Mean and standard deviation over a sliding window in O(1) per sample.
+    Values live in a preallocated ring buffer; Welford's update with removal keeps
+    the mean and sum of squared deviations, and the state is recomputed exactly
+    from the buffer once per window of samples to stop floating-point drift.
+    """
+    
+    __slots__ = ('window', 'values', 'count', 'next_index', 'mean', 'm2', 'since_resync')
+    
+    def __init__(self, window: int = 100):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.window = window
+        self.values = array('d', bytes(8 * window))
+        self.count = 0
+        self.next_index = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.since_resync = 0
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def push(self, value: float):
+        """Add a sample, dropping the oldest one once the window is full"""
+        value = float(value)
+        if self.count == self.window:
+            old = self.values[self.next_index]
+            if self.count == 1:
+                self.mean, self.m2 = 0.0, 0.0
+            else:
+                old_mean = self.mean
+                self.mean = (self.count * old_mean - old) / (self.count - 1)
+                self.m2 -= (old - old_mean) * (old - self.mean)
+            self.count -= 1
+        
+        self.values[self.next_index] = value
+        self.next_index = (self.next_index + 1) % self.window
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        
+        self.since_resync += 1
+        if self.since_resync >= self.window:
+            self.resync()
+    
+    def resync(self):
+        """Recompute mean and M2 exactly from the buffered samples"""
+        self.since_resync = 0
+        if self.count == 0:
+            return
+        if self.count == self.window:
+            samples = np.frombuffer(self.values, dtype=np.float64)
+        else:
+            samples = np.frombuffer(self.values, dtype=np.float64)[:self.count]
+        self.mean = float(samples.mean())
+        self.m2 = float(((samples - self.mean) ** 2).sum())
+    
+    @property
+    def variance(self) -> float:
+        """Population variance, matching np.var"""
+        return max(self.m2, 0.0) / self.count if self.count else 0.0
+    
+    @property
+    def std(self) -> float:
+        return self.variance ** 0.5
+    
+    def is_outlier(self, value: float, sigmas: float = 2.0) -> bool:
+        """True when value is more than `sigmas` standard deviations above the mean"""
+        return value > self.mean + sigmas * self.std
+
+class QuantileSketch:
+    """
+    Streaming quantiles with bounded memory and relative-error guarantees.
+    Samples fall into log-spaced buckets (DDSketch-style), so any reported quantile is
+    within `relative_accuracy` of a true sample at that rank. Bucket weights sit in a
+    Fenwick tree, making insert, removal and quantile lookup O(log buckets).
+    Two windows are supported:
+      window    - exact sliding window over the last N samples (ring buffer of values)
+      half_life - exponentially decaying window, measured in samples (forward decay)
+    """
+    
+    RESCALE_LIMIT = 1e100  # Forward-decay weights are renormalised past this
+    
+    def __init__(self, relative_accuracy: float = 0.01, window: Optional[int] = 10_000,
+                 half_life: Optional[float] = None, min_value: float = 1e-3, max_value: float = 1e7):
+        if (window is None) == (half_life is None):
+            raise ValueError("Configure exactly one of window or half_life")
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.max_value = max_value
+        self.offset = math.floor(math.log(min_value) / self.log_gamma)
+        self.bucket_count = math.ceil(math.log(max_value) / self.log_gamma) - self.offset + 1
+        self.tree = array('d', bytes(8 * (self.bucket_count + 1)))  # 1-based Fenwick tree
+        self.top_bit = 1 << (self.bucket_count.bit_length() - 1)
+        
+        self.window = window
+        self.values = array('d', bytes(8 * window)) if window else None
+        self.next_index = 0
+        self.count = 0
+        
+        self.decay = 2 ** (1 / half_life) if half_life else None
+        self.weight = 1.0
+        self.total_weight = 0.0
+        self.weighted_sum = 0.0
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def bucket(self, value: float) -> int:
+        value = min(max(value, self.min_value), self.max_value)
+        return math.ceil(math.log(value) / self.log_gamma) - self.offset
+    
+    def update(self, bucket: int, weight: float):
+        i = bucket + 1
+        tree = self.tree
+        while i <= self.bucket_count:
+            tree[i] += weight
+            i += i & -i
+    
+    def push(self, value: float):
+        """Add a sample, evicting the oldest one when a sliding window is full"""
+        value = float(value)
+        if self.decay is not None:
+            self.weight *= self.decay
+            if self.weight > self.RESCALE_LIMIT:
+                self.rescale(1 / self.weight)
+        elif self.count == self.window:
+            old = self.values[self.next_index]
+            self.update(self.bucket(old), -1.0)
+            self.total_weight -= 1.0
+            self.weighted_sum -= old
+            self.count -= 1
+        
+        if self.values is not None:
+            self.values[self.next_index] = value
+            self.next_index = (self.next_index + 1) % self.window
+        self.update(self.bucket(value), self.weight)
+        self.total_weight += self.weight
+        self.weighted_sum += value * self.weight
+        self.count += 1
+    
+    def rescale(self, factor: float):
+        """Scale every weight; the Fenwick tree is linear so nodes scale directly"""
+        for i in range(len(self.tree)):
+            self.tree[i] *= factor
+        self.weight *= factor
+        self.total_weight *= factor
+        self.weighted_sum *= factor
+    
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile (0 <= q <= 1) of the current window"""
+        if self.total_weight <= 0:
+            return 0.0
+        # Rank convention of np.percentile: q * (n - 1) samples lie below
+        target = q * (self.total_weight - self.weight) if self.decay else q * (self.count - 1)
+        
+        # Fenwick descent: largest prefix whose weight is <= target
+        position, step, tree = 0, self.top_bit, self.tree
+        while step:
+            nxt = position + step
+            if nxt <= self.bucket_count and tree[nxt] <= target:
+                position = nxt
+                target -= tree[nxt]
+            step >>= 1
+        
+        bucket = min(position, self.bucket_count - 1) + self.offset
+        return 2 * self.gamma ** bucket / (self.gamma + 1)
+    
+    def quantiles(self, qs: Tuple[float, ...] = (0.5, 0.95, 0.99)) -> Dict[str, float]:
+        return {f"p{round(q * 100):d}": self.quantile(q) for q in qs}
+    
+    @property
+    def mean(self) -> float:
+        return self.weighted_sum / self.total_weight if self.total_weight > 0 else 0.0
+
+class CountMinSketch:
+    """
+    Fixed-size frequency estimates for unbounded key sets.
+    depth rows of width counters; a key's estimate is the minimum of its counters, which
+    overestimates by at most 2N/width with probability 1 - 2^-depth. Updates are
+    conservative (only the minimal counters grow). Rows are array('d') so sketches of
+    the same shape can be blended elementwise.
+    """
+    
+    __slots__ = ('width', 'depth', 'rows', 'total')
+    
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.rows = [array('d', bytes(8 * width)) for _ in range(depth)]
+        self.total = 0.0
+    
+    def indexes(self, key: str) -> List[int]:
+        # Double hashing (h1 + i*h2) derives every row index from one 64-bit hash
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+    
+    def add(self, key: str, count: float = 1.0) -> float:
+        """Count a key and return its new estimate"""
+        idx = self.indexes(key)
+        estimate = min(row[i] for row, i in zip(self.rows, idx)) + count
+        for row, i in zip(self.rows, idx):
+            if row[i] < estimate:
+                row[i] = estimate
+        self.total += count
+        return estimate
+    
+    def estimate(self, key: str) -> float:
+        return min(row[i] for row, i in zip(self.rows, self.indexes(key)))
+    
+    def scale(self, factor: float):
+        for row in self.rows:
+            np.frombuffer(row, dtype=np.float64)[:] *= factor
+        self.total *= factor
+    
+    def clear(self):
+        self.scale(0.0)
+    
+    def blend(self, other: 'CountMinSketch', weight: float):
+        """self = (1 - weight) * self + weight * other, counter by counter"""
+        for row, other_row in zip(self.rows, other.rows):
+            values = np.frombuffer(row, dtype=np.float64)
+            values *= 1 - weight
+            values += weight * np.frombuffer(other_row, dtype=np.float64)
+        self.total = (1 - weight) * self.total + weight * other.total
+
+class SpaceSaving:
+    """
+    Space-Saving top-k heavy hitters with O(1) updates.
+    At most `capacity` keys are tracked; an unseen key replaces the current minimum and
+    inherits its count as error, so counts overestimate by at most `error[key]`.
+    Keys are grouped into buckets by count to find the minimum without a scan.
+    """
+    
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.buckets: Dict[int, Dict[str, None]] = defaultdict(dict)  # Insertion-ordered sets
+        self.min_count = 0
+    
+    def add(self, key: str) -> int:
+        count = self.counts.get(key)
+        if count is None:
+            if len(self.counts) < self.capacity:
+                count, error = 0, 0
+            else:
+                victim = next(iter(self.buckets[self.min_count]))
+                count = error = self.counts.pop(victim)
+                self.errors.pop(victim)
+                self.remove_from_bucket(victim, count)
+            self.errors[key] = error
+            if not self.counts or count < self.min_count:
+                self.min_count = count + 1
+        else:
+            self.remove_from_bucket(key, count)
+        
+        count += 1
+        self.counts[key] = count
+        self.buckets[count][key] = None
+        if self.min_count not in self.buckets:
+            self.min_count = count
+        return count
+    
+    def remove_from_bucket(self, key: str, count: int):
+        bucket = self.buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[count]
+    
+    def top(self, k: Optional[int] = None) -> List[Tuple[str, int, int]]:
+        """(key, count, max_error) for the heaviest keys, largest first"""
+        ranked = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        return [(key, count, self.errors[key]) for key, count in ranked[:k]]
+    
+    def clear(self):
+        self.counts.clear()
+        self.errors.clear()
+        self.buckets.clear()
+        self.min_count = 0
+
+class TrendEstimator:
+    """
+    Incremental least-squares line y = a + b*x, updated in O(1) per sample.
+    Sliding mode (window=N) keeps Welford-style means and co-moments with exact
+    removal of the sample leaving the window, resynced from the ring buffer once per
+    window. Exponentially weighted mode (alpha=...) needs no buffer and weights
+    recent samples more.
+    """
+    
+    __slots__ = ('window', 'alpha', 'xs', 'ys', 'next_index', 'count',
+                 'mean_x', 'mean_y', 'cov_xy', 'm2_x', 'since_resync', 'last_x', 'last_y')
+    
+    def __init__(self, window: Optional[int] = 20, alpha: Optional[float] = None):
+        if (window is None) == (alpha is None):
+            raise ValueError("Configure exactly one of window or alpha")
+        self.window = window
+        self.alpha = alpha
+        self.xs = array('d', bytes(8 * window)) if window else None
+        self.ys = array('d', bytes(8 * window)) if window else None
+        self.next_index = 0
+        self.count = 0
+        self.mean_x = self.mean_y = self.cov_xy = self.m2_x = 0.0
+        self.since_resync = 0
+        self.last_x = self.last_y = 0.0
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def push(self, x: float, y: float):
+        x, y = float(x), float(y)
+        self.last_x, self.last_y = x, y
+        
+        if self.alpha is not None:
+            if self.count == 0:
+                self.mean_x, self.mean_y = x, y
+            else:
+                dx, dy = x - self.mean_x, y - self.mean_y
+                self.mean_x += self.alpha * dx
+                self.mean_y += self.alpha * dy
+                self.cov_xy = (1 - self.alpha) * (self.cov_xy + self.alpha * dx * dy)
+                self.m2_x = (1 - self.alpha) * (self.m2_x + self.alpha * dx * dx)
+            self.count += 1
+            return
+        
+        if self.count == self.window:
+            self.remove(self.xs[self.next_index], self.ys[self.next_index])
+        self.xs[self.next_index] = x
+        self.ys[self.next_index] = y
+        self.next_index = (self.next_index + 1) % self.window
+        
+        self.count += 1
+        dx = x - self.mean_x
+        self.mean_x += dx / self.count
+        self.mean_y += (y - self.mean_y) / self.count
+        self.cov_xy += dx * (y - self.mean_y)
+        self.m2_x += dx * (x - self.mean_x)
+        
+        self.since_resync += 1
+        if self.since_resync >= self.window:
+            self.resync()
+    
+    def remove(self, x: float, y: float):
+        """Undo the contribution of a sample leaving the sliding window"""
+        if self.count <= 1:
+            self.count = 0
+            self.mean_x = self.mean_y = self.cov_xy = self.m2_x = 0.0
+            return
+        old_mean_x = (self.count * self.mean_x - x) / (self.count - 1)
+        old_mean_y = (self.count * self.mean_y - y) / (self.count - 1)
+        self.cov_xy -= (x - old_mean_x) * (y - self.mean_y)
+        self.m2_x -= (x - old_mean_x) * (x - self.mean_x)
+        self.mean_x, self.mean_y = old_mean_x, old_mean_y
+        self.count -= 1
+    
+    def resync(self):
+        """Recompute the moments exactly from the buffered samples"""
+        self.since_resync = 0
+        xs = np.frombuffer(self.xs, dtype=np.float64)[:self.count]
+        ys = np.frombuffer(self.ys, dtype=np.float64)[:self.count]
+        self.mean_x, self.mean_y = float(xs.mean()), float(ys.mean())
+        self.cov_xy = float(((xs - self.mean_x) * (ys - self.mean_y)).sum())
+        self.m2_x = float(((xs - self.mean_x) ** 2).sum())
+    
+    @property
+    def slope(self) -> float:
+        return self.cov_xy / self.m2_x if self.m2_x > 1e-12 else 0.0
+    
+    def predict(self, x: float) -> float:
+        return self.mean_y + self.slope * (x - self.mean_x)
+
+# ================== Packet Identity ==================
+
+PACKET_ID_EPOCH = 1_704_067_200.0  # 2024-01-01 UTC; counters start at milliseconds since then
+PACKET_ID_COUNTER_BITS = 48
+PACKET_ID_PREFIX_BITS = 8          # Agent prefixes per process (node numbers use the top 8 bits)
+
+class PacketIdSequence:
+    """Monotonic 64-bit packet ids for one agent (node | agent prefix | counter) as 16 hex digits"""
+    
+    __slots__ = ('base', 'counter')
+    
+    def __init__(self, base: int, start: int):
+        self.base = base
+        self.counter = itertools.count(start)  # next() is atomic, so threads can share a sequence
+    
+    def next_id(self) -> str:
+        return f"{self.base | next(self.counter):016x}"
+
+class PacketIdAllocator:
+    """
+    Hands out one PacketIdSequence per agent id. The node number keeps processes
+    running the same agents (sidecar shards) apart, and counters start at the current
+    time in milliseconds, so a restarted sidecar does not reissue ids still held in
+    its journal unless an agent averaged more than one id per millisecond.
+    """
+    
+    def __init__(self, node: int = 0):
+        self.lock = threading.Lock()
+        self.reset(node)
+    
+    def reset(self, node: int):
+        """Forget all sequences and allocate under a new node number (e.g. in a shard worker)"""
+        with self.lock:
+            self.node = node
+            self.sequences: Dict[str, PacketIdSequence] = {}
+    
+    def sequence(self, agent_id: str) -> PacketIdSequence:
+        with self.lock:
+            sequence = self.sequences.get(agent_id)
+            if sequence is None:
+                prefix = len(self.sequences)
+                if prefix >= 1 << PACKET_ID_PREFIX_BITS:
+                    raise ValueError(f"More than {1 << PACKET_ID_PREFIX_BITS} agent id prefixes")
+                base = ((self.node << PACKET_ID_PREFIX_BITS) | prefix) << PACKET_ID_COUNTER_BITS
+                start = int((time.time() - PACKET_ID_EPOCH) * 1000)
+                sequence = self.sequences[agent_id] = PacketIdSequence(base, start)
+            return sequence
+
+PACKET_IDS = PacketIdAllocator()
+
+def stable_packet_id(*parts: str) -> str:
+    """Content-derived 64-bit id, identical across processes and restarts, for deduplication"""
+    return hashlib.blake2b('\x1f'.join(parts).encode(), digest_size=8).hexdigest()
 
 # ================== Agent System ==================
 
 class IntelligenceAgent:
     """Base class for all intelligence agents"""
     
-    def __init__(self, agent_id: str, field_type: IntelligenceFieldType):
+    # Log keys the agent consumes; None receives every entry, () receives none
+    subscribed_keys: Optional[Tuple[str, ...]] = None
+    
+    def __init__(self, agent_id: str, field_type: IntelligenceFieldType,
+                 subscribed_keys: Optional[Tuple[str, ...]] = None):
         self.agent_id = agent_id
         self.field_type = field_type
         self.packet_count = 0
+        self.id_sequence = PACKET_IDS.sequence(agent_id)
         self.processing = True
+        if subscribed_keys is not None:
+            self.subscribed_keys = tuple(subscribed_keys)
+    
+    def accepts(self, log_entry: Dict[str, Any]) -> bool:
+        """Optional predicate applied after key routing; override to narrow further"""
+        return True
         
     async def process_log_entry(self, log_entry: Dict[str, Any]) -> Optional[IntelligencePacket]:
         """Process a log entry and potentially generate intelligence"""
-        raise NotImplementedError
+        return None
+    
+    async def process_batch(self, log_entries: List[Dict[str, Any]]) -> List[Optional[IntelligencePacket]]:
+        """Process a micro-batch of log entries, returning one result per entry"""
+        return [await self.process_log_entry(log_entry) for log_entry in log_entries]
     
     async def correlate_packets(self, packets: List[IntelligencePacket]) -> Optional[IntelligencePacket]:
         """Correlate multiple packets to generate higher-order intelligence"""
-        raise NotImplementedError
+        return None
     
     def generate_packet_id(self) -> str:
         """Generate unique packet ID"""
         self.packet_count += 1
-        unique_str = f"{self.agent_id}_{self.packet_count}_{time.time()}"
-        return hashlib.md5(unique_str.encode()).hexdigest()[:12]
+        return self.id_sequence.next_id()
 
 class HardwareMonitorAgent(IntelligenceAgent):
     """Agent for hardware monitoring intelligence"""
     
-    def __init__(self):
+    subscribed_keys = ('cpu_temp', 'memory')
+    
+    def __init__(self, window: int = 100, sigmas: float = 2.0):
         super().__init__("hardware_monitor", IntelligenceFieldType.HARDWARE)
-        self.cpu_history = deque(maxlen=100)
-        self.memory_history = deque(maxlen=100)
+        self.cpu_stats = RollingStats(window)
+        self.memory_stats = RollingStats(window)
+        self.sigmas = sigmas
         
     async def process_log_entry(self, log_entry: Dict[str, Any]) -> Optional[IntelligencePacket]:
         """Extract hardware intelligence from logs"""
@@ -169,15 +992,14 @@ class HardwareMonitorAgent(IntelligenceAgent):
             cpu_temp = log_entry.get('cpu_temp', 0)
             memory_usage = log_entry.get('memory', {}).get('used_percent', 0)
             
-            self.cpu_history.append(cpu_temp)
-            self.memory_history.append(memory_usage)
+            self.cpu_stats.push(cpu_temp)
+            self.memory_stats.push(memory_usage)
             
             # Detect anomalies
-            if len(self.cpu_history) > 10:
-                avg_cpu = np.mean(self.cpu_history)
-                std_cpu = np.std(self.cpu_history)
+            if len(self.cpu_stats) > 10:
+                avg_cpu = self.cpu_stats.mean
                 
-                if cpu_temp > avg_cpu + 2 * std_cpu:  # 2 sigma anomaly
+                if self.cpu_stats.is_outlier(cpu_temp, self.sigmas):  # 2 sigma anomaly
                     return IntelligencePacket(
                         id=self.generate_packet_id(),
                         timestamp=time.time(),
@@ -225,19 +1047,23 @@ class HardwareMonitorAgent(IntelligenceAgent):
 class PerformanceAnalysisAgent(IntelligenceAgent):
     """Agent for performance analysis intelligence"""
     
-    def __init__(self):
+    subscribed_keys = ('response_time',)
+    
+    def __init__(self, window: Optional[int] = 100, half_life: Optional[float] = None,
+                 relative_accuracy: float = 0.01):
         super().__init__("performance_analyzer", IntelligenceFieldType.PERFORMANCE)
-        self.response_times = deque(maxlen=100)
+        # Sliding window by default; pass half_life (in samples) with window=None to decay instead
+        self.response_times = QuantileSketch(relative_accuracy=relative_accuracy,
+                                             window=window, half_life=half_life)
         
     async def process_log_entry(self, log_entry: Dict[str, Any]) -> Optional[IntelligencePacket]:
         """Extract performance intelligence"""
         if 'response_time' in log_entry:
             response_time = log_entry['response_time']
-            self.response_times.append(response_time)
+            self.response_times.push(response_time)
             
             if len(self.response_times) > 20:
-                avg_response = np.mean(self.response_times)
-                p95_response = np.percentile(self.response_times, 95)
+                p95_response = self.response_times.quantile(0.95)
                 
                 if response_time > p95_response:
                     return IntelligencePacket(
@@ -249,8 +1075,10 @@ class PerformanceAnalysisAgent(IntelligenceAgent):
                         data={
                             'metric': 'response_time_spike',
                             'current': response_time,
-                            'average': avg_response,
+                            'average': self.response_times.mean,
+                            'p50': self.response_times.quantile(0.5),
                             'p95': p95_response,
+                            'p99': self.response_times.quantile(0.99),
                             'impact': 'user_experience_degradation'
                         }
                     )
@@ -258,75 +1086,160 @@ class PerformanceAnalysisAgent(IntelligenceAgent):
         return None
 
 class SecurityAuditAgent(IntelligenceAgent):
-    """Agent for security audit intelligence"""
+    """
+    Agent for security audit intelligence.
+    user:access_type counts live in fixed-size sketches over tumbling windows: a
+    Count-Min Sketch for the current window, an exponentially weighted baseline sketch
+    of past windows, and a Space-Saving top-k of the window's heaviest keys (reported
+    in alerts and the metrics report). A key alerts once per window when its count
+    exceeds both `min_count` and `rate_ratio` times its baseline, so alerts follow
+    rate changes rather than lifetime totals.
+    """
     
-    def __init__(self):
+    subscribed_keys = ('access_type',)
+    
+    def __init__(self, window_seconds: float = 60.0, min_count: int = 100,
+                 rate_ratio: float = 3.0, baseline_weight: float = 0.2,
+                 sketch_width: int = 4096, sketch_depth: int = 4, top_k: int = 100):
         super().__init__("security_auditor", IntelligenceFieldType.SECURITY)
-        self.access_patterns = defaultdict(int)
+        self.window_seconds = window_seconds
+        self.min_count = min_count
+        self.rate_ratio = rate_ratio
+        self.baseline_weight = baseline_weight
+        self.window_counts = CountMinSketch(sketch_width, sketch_depth)
+        self.baseline_counts = CountMinSketch(sketch_width, sketch_depth)
+        self.top_accessors = SpaceSaving(top_k)
+        self.window_start: Optional[float] = None
+        self.windows_seen = 0
+        self.alerted: Set[str] = set()  # Keys already alerted in the current window
+    
+    def advance_window(self, now: float):
+        """Roll tumbling windows forward, folding finished ones into the baseline"""
+        if self.window_start is None:
+            self.window_start = now
+            return
         
+        elapsed = int((now - self.window_start) // self.window_seconds)
+        if elapsed <= 0:
+            return
+        # Plain average over the first windows so the baseline does not start biased to zero
+        weight = max(self.baseline_weight, 1.0 / (self.windows_seen + 1))
+        self.baseline_counts.blend(self.window_counts, weight)
+        if elapsed > 1:
+            # Idle windows count as zero traffic
+            self.baseline_counts.scale((1 - self.baseline_weight) ** (elapsed - 1))
+        self.window_counts.clear()
+        self.top_accessors.clear()
+        self.alerted.clear()
+        self.window_start += elapsed * self.window_seconds
+        self.windows_seen += elapsed
+    
+    def top_accessor_report(self, k: int = 10) -> List[Dict[str, Any]]:
+        """The current window's heaviest user:access_type keys, largest first"""
+        return [{'key': key, 'count': count, 'max_error': error}
+                for key, count, error in self.top_accessors.top(k)]
+    
     async def process_log_entry(self, log_entry: Dict[str, Any]) -> Optional[IntelligencePacket]:
         """Extract security intelligence"""
         if 'access_type' in log_entry:
             access_type = log_entry['access_type']
             user = log_entry.get('user', 'unknown')
+            self.advance_window(log_entry.get('timestamp') or time.time())
             
             pattern_key = f"{user}:{access_type}"
-            self.access_patterns[pattern_key] += 1
+            count = self.window_counts.add(pattern_key)
+            self.top_accessors.add(pattern_key)
             
-            # Detect unusual access patterns
-            if self.access_patterns[pattern_key] > 100:
-                return IntelligencePacket(
-                    id=self.generate_packet_id(),
-                    timestamp=time.time(),
-                    source_agent=self.agent_id,
-                    field_type=self.field_type,
-                    confidence=0.75,
-                    data={
-                        'alert_type': 'unusual_access_pattern',
-                        'user': user,
-                        'access_type': access_type,
-                        'count': self.access_patterns[pattern_key],
-                        'risk_level': 'medium'
-                    }
-                )
+            # Detect access rates well above this key's baseline
+            if count > self.min_count and pattern_key not in self.alerted:
+                baseline = self.baseline_counts.estimate(pattern_key)
+                if count > self.rate_ratio * baseline:
+                    self.alerted.add(pattern_key)
+                    ratio = count / baseline if baseline > 0 else float('inf')
+                    return IntelligencePacket(
+                        id=self.generate_packet_id(),
+                        timestamp=time.time(),
+                        source_agent=self.agent_id,
+                        field_type=self.field_type,
+                        confidence=0.75,
+                        data={
+                            'alert_type': 'unusual_access_pattern',
+                            'user': user,
+                            'access_type': access_type,
+                            'count': int(count),
+                            'baseline': baseline,
+                            'rate_ratio': ratio,
+                            'window_seconds': self.window_seconds,
+                            'risk_level': 'high' if ratio >= 2 * self.rate_ratio else 'medium',
+                            'top_accessors': self.top_accessor_report(5)
+                        }
+                    )
         
         return None
 
 class PredictiveModelAgent(IntelligenceAgent):
     """Agent for predictive intelligence using simple ML"""
     
-    def __init__(self):
+    FORECAST_HORIZONS = (1, 5, 10, 30)  # Minutes ahead
+    subscribed_keys = ('cpu_temp',)
+    
+    def __init__(self, window: Optional[int] = 20, alpha: Optional[float] = None,
+                 warmup_entries: int = 100, trend_threshold: float = 0.5):
         super().__init__("predictive_model", IntelligenceFieldType.PREDICTIVE)
-        self.historical_data = deque(maxlen=1000)
-        
+        # Temperature against sample index, so trend_rate stays in degrees per sample
+        self.temperature_trend = TrendEstimator(window=window, alpha=alpha)
+        self.sample_interval = RollingStats(window or 100)  # Seconds between CPU samples
+        self.samples_seen = 0
+        self.last_timestamp: Optional[float] = None
+        self.warmup_entries = warmup_entries
+        self.trend_threshold = trend_threshold
+    
+    def samples_per_minute(self) -> float:
+        """Observed CPU sample rate; one sample per minute until timestamps say otherwise"""
+        interval = self.sample_interval.mean
+        return 60.0 / interval if len(self.sample_interval) and interval > 0 else 1.0
+    
     async def process_log_entry(self, log_entry: Dict[str, Any]) -> Optional[IntelligencePacket]:
         """Generate predictive intelligence"""
-        self.historical_data.append(log_entry)
+        if 'cpu_temp' not in log_entry:
+            return None
         
-        if len(self.historical_data) > 100:
+        current_temp = log_entry['cpu_temp']
+        timestamp = log_entry.get('timestamp')
+        if timestamp is not None:
+            if self.last_timestamp is not None and timestamp >= self.last_timestamp:
+                self.sample_interval.push(timestamp - self.last_timestamp)
+            self.last_timestamp = timestamp
+        self.temperature_trend.push(self.samples_seen, current_temp)
+        self.samples_seen += 1
+        
+        if self.samples_seen > self.warmup_entries:
             # Simple trend prediction
-            if 'cpu_temp' in log_entry:
-                recent_temps = [d.get('cpu_temp', 0) for d in list(self.historical_data)[-20:]]
-                if recent_temps:
-                    trend = np.polyfit(range(len(recent_temps)), recent_temps, 1)[0]
-                    
-                    if trend > 0.5:  # Rising temperature trend
-                        predicted_temp = recent_temps[-1] + trend * 10  # 10 minutes ahead
-                        
-                        return IntelligencePacket(
-                            id=self.generate_packet_id(),
-                            timestamp=time.time(),
-                            source_agent=self.agent_id,
-                            field_type=self.field_type,
-                            confidence=0.7,
-                            data={
-                                'prediction': 'thermal_threshold_breach',
-                                'current_temp': recent_temps[-1],
-                                'predicted_temp': predicted_temp,
-                                'time_to_threshold': (85 - recent_temps[-1]) / trend if trend > 0 else float('inf'),
-                                'trend_rate': trend
-                            }
-                        )
+            trend = self.temperature_trend.slope
+            
+            if trend > self.trend_threshold:  # Rising temperature trend
+                per_minute = self.samples_per_minute()
+                last_x = self.temperature_trend.last_x
+                forecasts = {
+                    f"{minutes}m": self.temperature_trend.predict(last_x + minutes * per_minute)
+                    for minutes in self.FORECAST_HORIZONS
+                }
+                
+                return IntelligencePacket(
+                    id=self.generate_packet_id(),
+                    timestamp=time.time(),
+                    source_agent=self.agent_id,
+                    field_type=self.field_type,
+                    confidence=0.7,
+                    data={
+                        'prediction': 'thermal_threshold_breach',
+                        'current_temp': current_temp,
+                        'predicted_temp': forecasts['10m'],
+                        'forecasts': forecasts,
+                        'time_to_threshold': (85 - current_temp) / (trend * per_minute),  # Minutes
+                        'trend_rate': trend
+                    }
+                )
         
         return None
     
@@ -355,79 +1268,1093 @@ class PredictiveModelAgent(IntelligenceAgent):
         
         return None
 
-# ================== Intelligence Ocean ==================
+def create_agent_swarm() -> List[IntelligenceAgent]:
+    """The default agent set; each sidecar shard runs its own copy"""
+    agents = [
+        HardwareMonitorAgent(),
+        PerformanceAnalysisAgent(),
+        SecurityAuditAgent(),
+        PredictiveModelAgent(),
+    ]
+    
+    # Add more specialized agents
+    for i in range(3):  # Add 3 generic correlation agents
+        agent = IntelligenceAgent(f"correlator_{i}", IntelligenceFieldType.CORRELATION,
+                                  subscribed_keys=())  # Correlation only, no log keys
+        agents.append(agent)
+    return agents
 
-class IntelligenceOcean:
+class AgentRouter:
     """
-    The ocean where all intelligence fields interact and create emergent knowledge.
-    Uses parallel processing to create waves of intelligence that interact.
+    Key-to-agent index so each log entry reaches only the agents that consume it.
+    Agents with subscribed_keys None are wildcard subscribers; each agent's accepts()
+    predicate runs after key matching. Routes keep the sidecar's agent order.
     """
     
-    def __init__(self, max_workers: int = 10):
-        self.fields: Dict[str, IntelligenceField] = {}
-        self.all_packets: Dict[str, IntelligencePacket] = {}
-        self.packet_graph: Dict[str, Set[str]] = defaultdict(set)  # Packet relationships
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
-        self.process_executor = ProcessPoolExecutor(max_workers=4)
-        self.lock = threading.Lock()
-        self.ocean_metrics = {
-            'total_packets': 0,
-            'total_fields': 0,
-            'emergence_events': 0,
-            'correlation_strength': 0.0
-        }
-        
-    def add_packet(self, packet: IntelligencePacket):
-        """Add a packet to the ocean and assign to appropriate field"""
-        with self.lock:
-            self.all_packets[packet.id] = packet
-            self.ocean_metrics['total_packets'] += 1
-            
-            # Find or create appropriate field
-            field_key = f"{packet.field_type.value}_{int(packet.timestamp // 300)}"  # 5-minute buckets
-            
-            if field_key not in self.fields:
-                self.fields[field_key] = IntelligenceField(
-                    field_id=field_key,
-                    field_type=packet.field_type,
-                    creation_time=packet.timestamp
-                )
-                self.ocean_metrics['total_fields'] += 1
-            
-            self.fields[field_key].add_packet(packet)
-            
-            # Update packet graph
-            for parent_id in packet.parent_packets:
-                self.packet_graph[parent_id].add(packet.id)
-                self.packet_graph[packet.id].add(parent_id)
+    def __init__(self, agents: List[IntelligenceAgent], enabled: bool = True):
+        self.agents = agents
+        self.enabled = enabled
+        self.key_index: Dict[str, List[int]] = defaultdict(list)
+        self.wildcard: List[int] = []
+        for position, agent in enumerate(agents):
+            if agent.subscribed_keys is None:
+                self.wildcard.append(position)
+            else:
+                for key in agent.subscribed_keys:
+                    self.key_index[key].append(position)
+        self.key_index = dict(self.key_index)
+        # Agents that keep the default predicate skip the per-entry accepts() call
+        self.filtered = {position for position, agent in enumerate(agents)
+                         if type(agent).accepts is not IntelligenceAgent.accepts}
     
-    def create_wave(self, source_packets: List[IntelligencePacket]) -> List[IntelligencePacket]:
-        """
-        Create a 'wave' of intelligence by processing packets in parallel.
-        Waves propagate through the ocean creating new intelligence.
-        """
-        wave_packets = []
+    def route(self, log_entry: Dict[str, Any]) -> List[IntelligenceAgent]:
+        """Agents subscribed to at least one key present in log_entry"""
+        if not self.enabled:
+            return self.agents
         
-        def process_packet_interactions(p1: IntelligencePacket, p2: IntelligencePacket):
+        positions = set(self.wildcard)
+        for key, subscribers in self.key_index.items():
+            if key in log_entry:
+                positions.update(subscribers)
+        return [self.agents[position] for position in sorted(positions)
+                if position not in self.filtered or self.agents[position].accepts(log_entry)]
+
+async def run_agent_batch(agents: List[IntelligenceAgent], router: AgentRouter,
+                          log_entries: List[Any]) -> List[List[IntelligencePacket]]:
+    """Run one process_batch call per routed agent and regroup the packets per entry"""
+    # Each agent gets the sub-batch of entries routed to it, remembering entry positions
+    routed: Dict[int, Tuple[IntelligenceAgent, List[int], List[Any]]] = {}
+    for line_index, log_entry in enumerate(log_entries):
+        for agent in router.route(log_entry):
+            if id(agent) not in routed:
+                routed[id(agent)] = (agent, [], [])
+            _, indices, entries = routed[id(agent)]
+            indices.append(line_index)
+            entries.append(log_entry)
+    
+    order = [routed[id(agent)] for agent in agents if id(agent) in routed]
+    results = await asyncio.gather(*(agent.process_batch(entries) for agent, _, entries in order))
+    
+    per_line: List[List[IntelligencePacket]] = [[] for _ in log_entries]
+    for (_, indices, _), packets in zip(order, results):
+        for line_index, packet in zip(indices, packets):
+            if packet is not None:
+                per_line[line_index].append(packet)
+    return per_line
+
+# ================== Graph Analytics ==================
+
+def merge_csr(indptr: np.ndarray, indices: np.ndarray, src: np.ndarray, dst: np.ndarray,
+              node_count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Merge new (src, dst) edges into a CSR adjacency without re-sorting the old edges:
+    every existing edge keeps its rank in its row and the new ones are sorted and
+    placed after them, so the cost is O(E + P log P) for P new edges.
+    """
+    old_rows = len(indptr) - 1
+    base_counts = np.zeros(node_count, dtype=np.int64)
+    base_counts[:old_rows] = np.diff(indptr)
+    order = np.argsort(src, kind='stable')
+    src, dst = src[order], dst[order]
+    new_counts = np.bincount(src, minlength=node_count)
+    
+    merged_indptr = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(base_counts + new_counts, out=merged_indptr[1:])
+    merged = np.empty(merged_indptr[-1], dtype=np.int64)
+    
+    base_src = np.repeat(np.arange(old_rows), base_counts[:old_rows])
+    merged[merged_indptr[base_src] + np.arange(len(indices)) - indptr[base_src]] = indices
+    new_indptr = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(new_counts, out=new_indptr[1:])
+    merged[merged_indptr[src] + base_counts[src] + np.arange(len(src)) - new_indptr[src]] = dst
+    return merged_indptr, merged
+
+def filter_csr(indptr: np.ndarray, indices: np.ndarray, alive: np.ndarray,
+               remap: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Drop rows and edges of dead nodes, optionally renumbering the survivors"""
+    src = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    keep = alive[src] & alive[indices]
+    src, indices = src[keep], indices[keep]
+    if remap is not None:
+        src, indices = remap[src], remap[indices]
+        node_count = int(alive.sum())
+    else:
+        node_count = len(alive)
+    filtered_indptr = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=node_count), out=filtered_indptr[1:])
+    return filtered_indptr, indices
+
+def csr_gather(indptr: np.ndarray, indices: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Concatenated neighbor lists of `rows`"""
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    total = int(lengths.sum())
+    if not total:
+        return indices[:0]
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return indices[offsets + np.arange(total)]
+
+@dataclass(frozen=True)
+class GraphSnapshot:
+    """
+    The packet graph as of its last merge: parent -> child (out) and child -> parent
+    (in) CSR arrays over live nodes. The arrays are never mutated afterwards, so
+    queries run without the graph lock. ids and index are shared with the live graph
+    (appends and removals only, until a renumbering swaps in new ones), so slots past
+    the snapshot and ids removed since are skipped.
+    """
+    ids: List[Optional[str]]
+    index: Dict[str, int]
+    out_indptr: np.ndarray
+    out_indices: np.ndarray
+    in_indptr: np.ndarray
+    in_indices: np.ndarray
+    alive: np.ndarray
+    
+    @property
+    def node_count(self) -> int:
+        return int(self.alive.sum())
+    
+    @property
+    def edge_count(self) -> int:
+        return len(self.out_indices)
+    
+    def degrees(self) -> np.ndarray:
+        """Undirected degree of every node slot (0 for dead slots)"""
+        return np.diff(self.out_indptr) + np.diff(self.in_indptr)
+    
+    def component_labels(self) -> np.ndarray:
+        """
+        Connected-component label (the smallest member slot) of every node slot.
+        Vectorized union-find: roots of each edge's endpoints are hooked onto the
+        smaller root, then pointer jumping compresses every path, until no edge
+        joins two different roots.
+        """
+        parent = np.arange(len(self.alive))
+        src = np.repeat(np.arange(len(self.alive)), np.diff(self.out_indptr))
+        dst = self.out_indices
+        while True:
+            src_root, dst_root = parent[src], parent[dst]
+            split = src_root != dst_root
+            if not split.any():
+                return parent
+            np.minimum.at(parent, np.maximum(src_root[split], dst_root[split]),
+                          np.minimum(src_root[split], dst_root[split]))
+            while True:
+                grandparent = parent[parent]
+                if np.array_equal(grandparent, parent):
+                    break
+                parent = grandparent
+    
+    def components(self, largest: int = 5) -> Dict[str, Any]:
+        """Component count and the sizes of the largest components"""
+        labels = self.component_labels()[self.alive]
+        if not len(labels):
+            return {'count': 0, 'largest': [], 'singletons': 0}
+        sizes = np.bincount(labels)
+        sizes = sizes[sizes > 0]
+        return {
+            'count': len(sizes),
+            'largest': np.sort(sizes)[::-1][:largest].tolist(),
+            'singletons': int((sizes == 1).sum())
+        }
+    
+    def reach(self, packet_id: str, indptr: np.ndarray, indices: np.ndarray,
+              max_depth: Optional[int] = None) -> List[str]:
+        """Packet ids reachable from `packet_id` along one edge direction, nearest first"""
+        start = self.index.get(packet_id)
+        if start is None or start >= len(self.alive) or not self.alive[start]:
+            return []
+        seen = np.zeros(len(self.alive), dtype=bool)
+        seen[start] = True
+        frontier = np.array([start])
+        found = []
+        depth = 0
+        while len(frontier) and (max_depth is None or depth < max_depth):
+            neighbors = csr_gather(indptr, indices, frontier)
+            frontier = np.unique(neighbors[~seen[neighbors]])
+            seen[frontier] = True
+            found.extend(frontier.tolist())
+            depth += 1
+        return [packet_id for packet_id in map(self.ids.__getitem__, found) if packet_id is not None]
+    
+    def lineage(self, packet_id: str, max_depth: Optional[int] = None) -> Dict[str, List[str]]:
+        """Every ancestor (packets it was derived from) and descendant of a packet"""
+        return {
+            'ancestors': self.reach(packet_id, self.in_indptr, self.in_indices, max_depth),
+            'descendants': self.reach(packet_id, self.out_indptr, self.out_indices, max_depth)
+        }
+    
+    def top_central(self, k: int = 10) -> List[Dict[str, Any]]:
+        """The k packets with the highest degree centrality, most central first"""
+        degrees = self.degrees()
+        k = min(k, int((degrees > 0).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-degrees, k - 1)[:k]
+        top = top[np.argsort(-degrees[top], kind='stable')]
+        scale = 1.0 / max(self.node_count - 1, 1)
+        return [{'packet_id': self.ids[node], 'degree': int(degrees[node]),
+                 'centrality': float(degrees[node]) * scale} for node in top.tolist()]
+
+class PacketGraph:
+    """
+    Directed lineage graph of packets (parent -> child) kept as CSR arrays.
+    New edges collect in per-node pending lists and are merged into the out/in
+    CSR arrays once merge_threshold accumulate or a snapshot is taken. Removed
+    nodes are masked at once and their edges dropped at the next merge, which also
+    renumbers node slots when more than half are dead. The live node count and
+    undirected degree sum that the ocean metrics read are exact at all times.
+    """
+    
+    def __init__(self, merge_threshold: int = 1 << 16):
+        self.merge_threshold = merge_threshold
+        self.index: Dict[str, int] = {}
+        self.ids: List[Optional[str]] = []
+        self.alive = bytearray()
+        self.has_parents = bytearray()  # Parent edges recorded (a packet's parents never change)
+        empty = np.zeros(0, dtype=np.int64)
+        self.out_indptr, self.out_indices = np.zeros(1, dtype=np.int64), empty
+        self.in_indptr, self.in_indices = np.zeros(1, dtype=np.int64), empty
+        self.pending_out: Dict[int, List[int]] = defaultdict(list)
+        self.pending_in: Dict[int, List[int]] = defaultdict(list)
+        self.pending_edges = 0
+        self.removed_since_merge = 0
+        self.live_edges = 0
+        self.merges = 0
+    
+    def __len__(self) -> int:
+        return len(self.index)
+    
+    def __contains__(self, packet_id: str) -> bool:
+        return packet_id in self.index
+    
+    @property
+    def degree_total(self) -> int:
+        """Sum of undirected degrees (each edge counted from both ends)"""
+        return 2 * self.live_edges
+    
+    def node(self, packet_id: str) -> int:
+        slot = self.index.get(packet_id)
+        if slot is None:
+            slot = self.index[packet_id] = len(self.ids)
+            self.ids.append(packet_id)
+            self.alive.append(1)
+            self.has_parents.append(0)
+        return slot
+    
+    def add_packet(self, packet_id: str, parent_ids: Iterable[str]) -> bool:
+        """Record a packet's parent edges; False if they were already recorded"""
+        child = self.node(packet_id)
+        if self.has_parents[child]:
+            return False
+        self.has_parents[child] = 1
+        for parent_id in dict.fromkeys(parent_ids):
+            if parent_id == packet_id:
+                continue
+            parent = self.node(parent_id)
+            self.pending_out[parent].append(child)
+            self.pending_in[child].append(parent)
+            self.live_edges += 1
+            self.pending_edges += 1
+        if self.pending_edges >= self.merge_threshold:
+            self.merge()
+        return True
+    
+    def neighbors(self, slot: int) -> List[int]:
+        """Merged and pending neighbors of a node slot in either direction (may include dead slots)"""
+        found = list(self.pending_out.get(slot, ()))
+        found.extend(self.pending_in.get(slot, ()))
+        if slot < len(self.out_indptr) - 1:
+            found.extend(self.out_indices[self.out_indptr[slot]:self.out_indptr[slot + 1]].tolist())
+            found.extend(self.in_indices[self.in_indptr[slot]:self.in_indptr[slot + 1]].tolist())
+        return found
+    
+    def remove_node(self, packet_id: str) -> bool:
+        """Remove a node with its edges; False if it was not in the graph"""
+        slot = self.index.pop(packet_id, None)
+        if slot is None:
+            return False
+        for neighbor in self.neighbors(slot):
+            if self.alive[neighbor]:
+                self.live_edges -= 1
+        self.alive[slot] = 0
+        self.ids[slot] = None
+        self.pending_out.pop(slot, None)
+        self.pending_in.pop(slot, None)
+        self.removed_since_merge += 1
+        return True
+    
+    def merge(self):
+        """Fold pending edges into the CSR arrays and drop removed nodes"""
+        node_count = len(self.ids)
+        if self.pending_edges:
+            # Lists of nodes removed since were popped, so pending_edges is only an upper bound
+            src = np.fromiter((s for s, targets in self.pending_out.items() for _ in targets),
+                              dtype=np.int64)
+            dst = np.fromiter((t for targets in self.pending_out.values() for t in targets),
+                              dtype=np.int64)
+            self.out_indptr, self.out_indices = merge_csr(self.out_indptr, self.out_indices,
+                                                          src, dst, node_count)
+            self.in_indptr, self.in_indices = merge_csr(self.in_indptr, self.in_indices,
+                                                        dst, src, node_count)
+            self.pending_out.clear()
+            self.pending_in.clear()
+            self.pending_edges = 0
+        elif len(self.out_indptr) - 1 < node_count:
+            pad = np.full(node_count - len(self.out_indptr) + 1, self.out_indptr[-1])
+            self.out_indptr = np.concatenate([self.out_indptr, pad])
+            self.in_indptr = np.concatenate([self.in_indptr, np.full(len(pad), self.in_indptr[-1])])
+        
+        if self.removed_since_merge:
+            alive = np.frombuffer(bytes(self.alive), dtype=np.uint8).astype(bool)
+            remap = None
+            if 2 * (node_count - len(self.index)) > node_count:
+                remap = np.cumsum(alive) - 1
+                live = np.flatnonzero(alive).tolist()
+                self.ids = [self.ids[slot] for slot in live]
+                self.index = {packet_id: slot for slot, packet_id in enumerate(self.ids)}
+                self.alive = bytearray(b'\x01') * len(self.ids)
+                self.has_parents = bytearray(self.has_parents[slot] for slot in live)
+            self.out_indptr, self.out_indices = filter_csr(self.out_indptr, self.out_indices, alive, remap)
+            self.in_indptr, self.in_indices = filter_csr(self.in_indptr, self.in_indices, alive, remap)
+            self.removed_since_merge = 0
+        self.merges += 1
+    
+    def snapshot(self) -> GraphSnapshot:
+        """Merge pending changes and freeze the arrays for lock-free queries"""
+        if self.pending_edges or self.removed_since_merge or len(self.out_indptr) - 1 < len(self.ids):
+            self.merge()
+        return GraphSnapshot(
+            ids=self.ids,
+            index=self.index,
+            out_indptr=self.out_indptr,
+            out_indices=self.out_indices,
+            in_indptr=self.in_indptr,
+            in_indices=self.in_indices,
+            alive=np.frombuffer(bytes(self.alive), dtype=np.uint8).astype(bool)
+        )
+
+# ================== Field Windowing ==================
+
+WindowKey = Tuple[int, int]  # (field type code, window number)
+
+class WindowPolicy:
+    """
+    How the packets of a field type are grouped into windows, each window being one
+    IntelligenceField keyed by an integer (field type code, window number) tuple.
+    max_age overrides RetentionPolicy.max_field_age for the field types it serves.
+    """
+    
+    kind = "window"
+    
+    def __init__(self, max_age: Optional[float] = None):
+        self.max_age = max_age
+    
+    @property
+    def span(self) -> float:
+        """Longest time range one window covers (sizes the coherence kernel)"""
+        raise NotImplementedError
+    
+    def assign(self, code: int, timestamp: float) -> Tuple[WindowKey, ...]:
+        """Keys of the windows a packet joins"""
+        raise NotImplementedError
+    
+    def bounds(self, key: WindowKey) -> Tuple[float, float]:
+        """(start, end) of a window; once the ocean's clock passes end it is closed"""
+        raise NotImplementedError
+    
+    def owned(self, key: WindowKey, packets: List[IntelligencePacket]) -> List[IntelligencePacket]:
+        """The packets that belong to no other window once `key` (and older windows) are gone"""
+        return packets
+    
+    def discard(self, key: WindowKey):
+        """Forget any state kept for a retired window"""
+    
+    def label(self, field_type: IntelligenceFieldType, key: WindowKey) -> str:
+        """Field id shown in reports, formatted once per window"""
+        return f"{field_type.value}_{key[1]}"
+
+class SlidingWindows(WindowPolicy):
+    """Windows of `size` seconds starting every `slide` seconds; each packet joins size/slide of them"""
+    
+    kind = "sliding"
+    
+    def __init__(self, size: float, slide: float, max_age: Optional[float] = None):
+        super().__init__(max_age)
+        overlap = size / slide if slide > 0 else 0
+        if overlap < 1 or overlap != int(overlap):
+            raise ValueError(f"Window size {size} must be a positive multiple of the slide {slide}")
+        self.size = size
+        self.slide = slide
+        self.overlap = int(overlap)
+    
+    @property
+    def span(self) -> float:
+        return self.size
+    
+    def assign(self, code: int, timestamp: float) -> Tuple[WindowKey, ...]:
+        newest = int(timestamp // self.slide)
+        return tuple((code, number) for number in range(newest - self.overlap + 1, newest + 1))
+    
+    def bounds(self, key: WindowKey) -> Tuple[float, float]:
+        start = key[1] * self.slide
+        return start, start + self.size
+    
+    def owned(self, key: WindowKey, packets: List[IntelligencePacket]) -> List[IntelligencePacket]:
+        # Windows retire oldest first, so a packet is released with the newest window holding it
+        if self.overlap == 1:
+            return packets
+        return [p for p in packets if int(p.timestamp // self.slide) == key[1]]
+
+class TumblingWindows(SlidingWindows):
+    """Back-to-back windows of `size` seconds (the classic 5-minute field buckets)"""
+    
+    kind = "tumbling"
+    
+    def __init__(self, size: float = FIELD_BUCKET_SECONDS, max_age: Optional[float] = None):
+        super().__init__(size, size, max_age)
+    
+    def assign(self, code: int, timestamp: float) -> Tuple[WindowKey, ...]:
+        return ((code, int(timestamp // self.size)),)
+
+class SessionWindows(WindowPolicy):
+    """
+    Windows that stay open while packets keep arriving within `gap` seconds of the
+    previous one, in arrival order. max_duration splits long sessions so the coherence
+    kernel and retention stay bounded.
+    """
+    
+    kind = "session"
+    
+    def __init__(self, gap: float = 60.0, max_duration: float = FIELD_BUCKET_SECONDS,
+                 max_age: Optional[float] = None):
+        super().__init__(max_age)
+        self.gap = gap
+        self.max_duration = max_duration
+        self.numbers = itertools.count()
+        self.open: Dict[int, WindowKey] = {}            # Field type code -> its open session
+        self.sessions: Dict[WindowKey, List[float]] = {}  # Live session -> [start, last packet]
+    
+    @property
+    def span(self) -> float:
+        return self.max_duration
+    
+    def assign(self, code: int, timestamp: float) -> Tuple[WindowKey, ...]:
+        key = self.open.get(code)
+        session = self.sessions.get(key) if key is not None else None
+        if (session is None or timestamp - session[1] > self.gap
+                or timestamp - session[0] > self.max_duration):
+            key = self.open[code] = (code, next(self.numbers))
+            self.sessions[key] = [timestamp, timestamp]
+        elif timestamp > session[1]:
+            session[1] = timestamp
+        return (key,)
+    
+    def bounds(self, key: WindowKey) -> Tuple[float, float]:
+        start, last = self.sessions.get(key, (0.0, 0.0))
+        return start, min(last + self.gap, start + self.max_duration)
+    
+    def discard(self, key: WindowKey):
+        self.sessions.pop(key, None)
+        if self.open.get(key[0]) == key:
+            del self.open[key[0]]
+    
+    def label(self, field_type: IntelligenceFieldType, key: WindowKey) -> str:
+        return f"{field_type.value}_session_{key[1]}"
+
+def parse_window_policy(spec: str) -> WindowPolicy:
+    """A policy from "tumbling:SIZE", "sliding:SIZE/SLIDE" or "session:GAP[/MAX_DURATION]" (seconds)"""
+    kind, _, args = spec.partition(':')
+    try:
+        values = [float(value) for value in args.split('/')] if args else []
+        if kind == "tumbling" and len(values) <= 1:
+            return TumblingWindows(*values)
+        if kind == "sliding" and len(values) == 2:
+            return SlidingWindows(*values)
+        if kind == "session" and len(values) <= 2:
+            return SessionWindows(*values)
+    except ValueError as e:
+        raise ValueError(f"Invalid window spec {spec!r}: {e}")
+    raise ValueError(f"Invalid window spec {spec!r}")
+
+class FieldWindowing:
+    """The window policy of each field type, with a default for the rest"""
+    
+    def __init__(self, default: Optional[WindowPolicy] = None,
+                 per_type: Optional[Dict[IntelligenceFieldType, WindowPolicy]] = None):
+        self.default = default or TumblingWindows()
+        self.per_type = dict(per_type or {})
+        self.by_code = [self.per_type.get(field_type, self.default) for field_type in FIELD_TYPES_BY_CODE]
+    
+    @property
+    def span(self) -> float:
+        return max(policy.span for policy in self.by_code)
+    
+    def bounds(self, key: WindowKey) -> Tuple[float, float]:
+        return self.by_code[key[0]].bounds(key)
+    
+    @classmethod
+    def from_specs(cls, specs: List[str]) -> 'FieldWindowing':
+        """From CLI specs: "sliding:300/60" sets the default, "security=session:30" one field type"""
+        default = None
+        per_type = {}
+        for spec in specs:
+            name, _, policy_spec = spec.rpartition('=')
+            if name:
+                per_type[IntelligenceFieldType(name)] = parse_window_policy(policy_spec)
+            else:
+                default = parse_window_policy(policy_spec)
+        return cls(default, per_type)
+
+# ================== Intelligence Ocean ==================
+
+WAVE_CORRELATION_THRESHOLD = 0.7  # Minimum p1.confidence * p2.confidence for a correlation
+WAVE_BLOCK_ELEMENTS = 1 << 22     # Pair-mask elements evaluated per vectorized block
+
+CORRELATION_INSIGHTS = {
+    (IntelligenceFieldType.HARDWARE, IntelligenceFieldType.PERFORMANCE): "Hardware conditions affecting performance",
+    (IntelligenceFieldType.PERFORMANCE, IntelligenceFieldType.SECURITY): "Performance anomalies indicating security issues",
+    (IntelligenceFieldType.HARDWARE, IntelligenceFieldType.PREDICTIVE): "Hardware trends predicting future states",
+    (IntelligenceFieldType.SECURITY, IntelligenceFieldType.USER_BEHAVIOR): "Security events correlating with user behavior",
+    (IntelligenceFieldType.DIAGNOSTIC, IntelligenceFieldType.OPTIMIZATION): "Diagnostic findings suggesting optimizations"
+}
+
+# (correlation_type, insight) for every ordered field-type pair, built once
+CORRELATION_TABLE = {
+    (first, second): (f"{first.value}_to_{second.value}",
+                      CORRELATION_INSIGHTS.get((first, second),
+                                               CORRELATION_INSIGHTS.get((second, first),
+                                                                        "Cross-domain correlation detected")))
+    for first in IntelligenceFieldType for second in IntelligenceFieldType
+}
+
+@dataclass
+class RetentionPolicy:
+    """Limits that keep a long-running ocean bounded in memory (None disables a limit)"""
+    max_field_age: Optional[float] = 3600.0   # Seconds before a field bucket expires
+    max_packets: Optional[int] = 200_000      # Resident packets across all fields
+    max_graph_nodes: Optional[int] = 400_000  # PacketGraph nodes, evicted least recently used first
+
+def process_resident_memory() -> int:
+    """Resident set size of this process in bytes (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+class RecentPacketIndex:
+    """
+    Arrival-ordered rings of the most recent packets, overall and per field type, so
+    "last K packets of type T" and "packets since t" cost O(K) instead of a copy of
+    the whole ocean. Packets that were evicted from the ocean are skipped on read.
+    """
+    
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self.overall: deque = deque(maxlen=capacity)
+        self.by_type: Dict[IntelligenceFieldType, deque] = defaultdict(lambda: deque(maxlen=capacity))
+    
+    def add(self, packet: IntelligencePacket):
+        self.overall.append(packet)
+        self.by_type[packet.field_type].append(packet)
+    
+    def ring(self, field_type: Optional[IntelligenceFieldType]) -> deque:
+        if field_type is None:
+            return self.overall
+        return self.by_type.get(field_type, ())
+    
+    def last(self, count: int, live: Dict[str, IntelligencePacket],
+             field_type: Optional[IntelligenceFieldType] = None) -> List[IntelligencePacket]:
+        """Up to `count` newest live packets, oldest first"""
+        found = []
+        for packet in reversed(self.ring(field_type)):
+            if len(found) >= count:
+                break
+            if packet.id in live:
+                found.append(packet)
+        found.reverse()
+        return found
+    
+    def since(self, timestamp: float, live: Dict[str, IntelligencePacket],
+              field_type: Optional[IntelligenceFieldType] = None) -> List[IntelligencePacket]:
+        """Live packets stamped at or after `timestamp`, in arrival order"""
+        # The ring is in arrival order, not timestamp order: a late packet must not hide newer ones
+        return [packet for packet in self.ring(field_type)
+                if packet.timestamp >= timestamp and packet.id in live]
+
+class SeenPacketFilter:
+    """
+    Memory of inserted packet ids for idempotent inserts: an exact FIFO set of the
+    most recent `capacity` ids, which still remembers packets retention already
+    evicted. Older ids are forgotten, so a packet is never dropped on a guess.
+    """
+    
+    def __init__(self, capacity: int = 100_000):
+        self.recent: Set[str] = set()
+        self.recent_order: deque = deque(maxlen=capacity)
+    
+    def is_duplicate(self, packet_id: str) -> bool:
+        return packet_id in self.recent
+    
+    def check_and_add(self, packet_id: str) -> bool:
+        """True for a repeat (nothing is recorded); otherwise remember the id"""
+        if packet_id in self.recent:
+            return True
+        self.remember(packet_id)
+        return False
+    
+    def extend(self, packet_ids: List[str]):
+        """Bulk add, e.g. replayed packets; only the newest `capacity` can be kept"""
+        for packet_id in packet_ids[-self.recent_order.maxlen:]:
+            if packet_id not in self.recent:
+                self.remember(packet_id)
+    
+    def remember(self, packet_id: str):
+        if len(self.recent_order) == self.recent_order.maxlen:
+            self.recent.discard(self.recent_order[0])
+        self.recent_order.append(packet_id)
+        self.recent.add(packet_id)
+
+class IntelligenceOcean:
+    """
+    The ocean where all intelligence fields interact and create emergent knowledge.
+    Uses parallel processing to create waves of intelligence that interact.
+    """
+    
+    WAVE_ENGINES = ('vectorized', 'pool')
+    
+    def __init__(self, max_workers: int = 10, coherence_mode: str = "incremental",
+                 coherence_tolerance: float = 1e-3, wave_engine: str = "vectorized",
+                 retention: Optional[RetentionPolicy] = None, compact_packets: bool = False,
+                 recent_capacity: int = 1024, snapshot_reads: bool = True,
+                 journal: Optional['PacketJournal'] = None, dedupe: bool = True,
+                 windowing: Optional[FieldWindowing] = None):
+        self.fields: Dict[WindowKey, IntelligenceField] = {}  # One field per window, oldest first
+        self.windowing = windowing or FieldWindowing()
+        self.finalized_windows: deque = deque(maxlen=256)  # Summaries of expired windows
+        self.all_packets: Dict[str, IntelligencePacket] = {}
+        self.packet_graph = PacketGraph()  # Parent -> child packet relationships
+        self.graph_recency: OrderedDict = OrderedDict()  # LRU order of packet_graph nodes
+        self.retention = retention or RetentionPolicy()
+        # Columnar storage; fields and all_packets then hold PacketView objects
+        self.packet_store = PacketStore() if compact_packets else None
+        self.recent = RecentPacketIndex(recent_capacity)  # Newest packets for correlation
+        # Ids already inserted, so repeated packets (e.g. the same wave pair) are rejected
+        self.seen = SeenPacketFilter(capacity=max(100_000, self.retention.max_packets or 0)) if dedupe else None
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        
+        # Lock order: self.lock (field map, packet index, retention) -> field.lock -> graph_lock.
+        # Readers use field_snapshots, a copy-on-write map of FieldSnapshot that writers
+        # update under the O(1) snapshot_lock, so metrics and emergence scans never block
+        # add_packet. snapshot_reads=False makes readers scan under the ocean locks instead.
+        self.lock = threading.Lock()
+        self.graph_lock = threading.Lock()
+        self.snapshot_lock = threading.Lock()  # Writers only, held for one dict operation
+        self.stats_lock = threading.Lock()  # Counters bumped by readers
+        self.field_snapshots: Dict[WindowKey, FieldSnapshot] = {}
+        self.snapshot_reads = snapshot_reads
+        
+        # Running aggregate so calculate_ocean_metrics is O(1): the coherence sum over
+        # live fields, kept with field_snapshots (packet_graph tracks its own degree sum)
+        self.coherence_total = 0.0
+        
+        # Append-only persistence; attach after restore() so replayed packets are not rewritten
+        self.journal = journal
+        self.ocean_metrics = {
+            'total_packets': 0,
+            'total_fields': 0,
+            'emergence_events': 0,
+            'correlation_strength': 0.0,
+            'expired_fields': 0,
+            'evicted_fields': 0,
+            'evicted_packets': 0,
+            'evicted_graph_nodes': 0,
+            'duplicate_packets': 0
+        }
+
+        # Shared decay kernel for incremental coherence ("exact" keeps the pairwise scan)
+        self.coherence_mode = coherence_mode
+        self.coherence_kernel = (ExponentialDecayKernel(tolerance=coherence_tolerance,
+                                                        span=max(FIELD_BUCKET_SECONDS, self.windowing.span))
+                                 if coherence_mode == "incremental" else None)
+
+        # "vectorized" batches pair tests through NumPy, "pool" fans out to self.executor
+        if wave_engine not in self.WAVE_ENGINES:
+            raise ValueError(f"Unknown wave engine: {wave_engine}")
+        self.wave_engine = wave_engine
+        
+    def add_packet(self, packet: IntelligencePacket) -> bool:
+        """
+        Add a packet to the ocean and assign to appropriate field. Idempotent: a
+        packet whose id was already inserted is rejected before any journal, field
+        or graph work, and False is returned.
+        """
+        with self.lock:
+            if self.is_duplicate(packet.id, record=True):
+                self.ocean_metrics['duplicate_packets'] += 1
+                return False
+            if self.journal is not None:
+                self.journal.append(packet)
+            if self.packet_store is not None:
+                packet = self.packet_store.append(packet)
+            self.all_packets[packet.id] = packet
+            self.recent.add(packet)
+            self.ocean_metrics['total_packets'] += 1
+            
+            # Find or create the fields of the packet's windows
+            code = FIELD_TYPE_CODES[packet.field_type]
+            targets = []
+            opened = False
+            for key in self.windowing.by_code[code].assign(code, packet.timestamp):
+                target = self.fields.get(key)
+                if target is None:
+                    target = self.open_window(key, packet.timestamp)
+                    self.ocean_metrics['total_fields'] += 1
+                    self.swap_field_snapshots(add=target)
+                    opened = True
+                targets.append(target)
+            if opened:
+                self.expire_fields(packet.timestamp)
+        
+        # Field state has its own lock, so writers to different fields do not serialize here
+        for target in targets:
+            with target.lock:
+                if not target.removed:
+                    target.add_packet(packet)
+                    self.publish_field(target)
+                    continue
+            # Retired since the lookup; otherwise the packet would sit in all_packets with
+            # no field to evict it, so re-resolve with self.lock held (retirement needs it)
+            with self.lock:
+                current = self.fields.get(target.window_key)
+                if current is None:
+                    current = self.open_window(target.window_key, packet.timestamp)
+                    self.ocean_metrics['total_fields'] += 1
+                    self.swap_field_snapshots(add=current)
+                with current.lock:
+                    current.add_packet(packet)
+                    self.publish_field(current)
+                self.expire_fields(packet.timestamp)
+        
+        # Update packet graph, unless the cap already evicted the packet (release_packets
+        # drops it from all_packets under graph_lock, so the node cannot be orphaned)
+        if packet.parent_packets:
+            with self.graph_lock:
+                if packet.id in self.all_packets:
+                    self.packet_graph.add_packet(packet.id, packet.parent_packets)
+                    for parent_id in packet.parent_packets:
+                        self.touch_graph_node(parent_id)
+                    self.touch_graph_node(packet.id)
+        
+        with self.lock:
+            self.enforce_packet_cap()
+            self.enforce_graph_cap()
+        return True
+    
+    def open_window(self, key: WindowKey, timestamp: float) -> IntelligenceField:
+        """Create the field of a new window (caller holds self.lock)"""
+        field_type = FIELD_TYPES_BY_CODE[key[0]]
+        target = self.fields[key] = IntelligenceField(
+            field_id=self.windowing.by_code[key[0]].label(field_type, key),
+            field_type=field_type,
+            creation_time=timestamp,
+            coherence_tracker=(IncrementalCoherence(self.coherence_kernel)
+                               if self.coherence_kernel is not None else None),
+            window_key=key
+        )
+        return target
+    
+    def is_duplicate(self, packet_id: str, record: bool = False) -> bool:
+        """Whether packet_id is live or recently inserted; record=True remembers a new id (caller holds self.lock)"""
+        if packet_id in self.all_packets:
+            return True
+        if self.seen is None:
+            return False
+        return self.seen.check_and_add(packet_id) if record else self.seen.is_duplicate(packet_id)
+    
+    # ---------- Persistence ----------
+    
+    def restore(self, packets: Iterable[IntelligencePacket], counted: bool = True) -> int:
+        """
+        Bulk-load journaled packets, rebuilding fields, the graph and the indexes.
+        Emergence and reader snapshots are refreshed once at the end and retention
+        runs once, so replay avoids the per-packet work of add_packet. counted=False
+        leaves the packet and field totals alone (a snapshot already carries them).
+        """
+        restored_ids: List[str] = []
+        # Packets grouped by window in arrival order
+        arrivals: Dict[WindowKey, List[IntelligencePacket]] = defaultdict(list)
+        policies = self.windowing.by_code
+        with self.lock, self.graph_lock:
+            for packet in packets:
+                if self.packet_store is not None:
+                    packet = self.packet_store.append(packet)
+                self.all_packets[packet.id] = packet
+                self.recent.add(packet)
+                restored_ids.append(packet.id)
+                code = FIELD_TYPE_CODES[packet.field_type]
+                for key in policies[code].assign(code, packet.timestamp):
+                    arrivals[key].append(packet)
+                
+                if packet.parent_packets:
+                    self.packet_graph.add_packet(packet.id, packet.parent_packets)
+                    for parent_id in packet.parent_packets:
+                        self.touch_graph_node(parent_id)
+                    self.touch_graph_node(packet.id)
+            
+            newest = 0.0
+            for key, field_packets in arrivals.items():
+                target = self.fields.get(key)
+                if target is None:
+                    target = self.open_window(key, field_packets[0].timestamp)
+                    self.ocean_metrics['total_fields'] += counted
+                target.extend(field_packets)
+                newest = max(newest, max(p.timestamp for p in field_packets))
+            restored = len(restored_ids)
+            self.ocean_metrics['total_packets'] += restored if counted else 0
+            if self.seen is not None:
+                self.seen.extend(restored_ids)
+            with self.snapshot_lock:
+                self.field_snapshots = {key: f.snapshot() for key, f in self.fields.items()}
+                self.coherence_total = sum(f.coherence_score for f in self.field_snapshots.values())
+        
+        with self.lock:
+            if restored:
+                self.expire_fields(newest)
+            self.enforce_packet_cap()
+            self.enforce_graph_cap()
+        return restored
+    
+    def restore_journal(self, journal: 'PacketJournal') -> int:
+        """Rebuild the ocean from a journal's latest snapshot and tail, then attach it"""
+        meta, snapshot_packets, tail_packets = journal.replay()
+        if meta:
+            self.ocean_metrics.update({key: value for key, value in meta['ocean_metrics'].items()
+                                       if key in self.ocean_metrics})
+        
+        # Replay allocates millions of long-lived objects; cyclic GC passes over them
+        # would roughly double its cost, so collection is paused until it finishes
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            restored = self.restore(snapshot_packets, counted=False) + self.restore(tail_packets)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        journal.open()
+        self.journal = journal
+        return restored
+    
+    def checkpoint_journal(self) -> Tuple[int, List[IntelligencePacket], Dict[str, Any]]:
+        """
+        Start a new journal segment and capture the live packets it supersedes.
+        Returns (segment, packets, counters) for PacketJournal.write_snapshot, which
+        can then run without the lock.
+        """
+        with self.lock:
+            segment = self.journal.rotate()
+            packets = list(self.all_packets.values())
+            counters = dict(self.ocean_metrics)
+        return segment, packets, counters
+    
+    # ---------- Reader snapshots ----------
+    
+    def publish_field(self, target: IntelligenceField):
+        """Replace a field's snapshot in place (caller holds target.lock; the key already exists)"""
+        snapshot = target.snapshot()
+        with self.snapshot_lock:
+            previous = self.field_snapshots.get(target.window_key)
+            self.coherence_total += snapshot.coherence_score - (previous.coherence_score if previous else 0.0)
+            self.field_snapshots[target.window_key] = snapshot
+    
+    def swap_field_snapshots(self, add: Optional[IntelligenceField] = None,
+                             remove: Optional[List[WindowKey]] = None):
+        """Copy-on-write change of the snapshot key set (caller holds self.lock)"""
+        with self.snapshot_lock:
+            snapshots = dict(self.field_snapshots)
+            if add is not None:
+                snapshots[add.window_key] = add.snapshot()
+            for key in remove or ():
+                snapshots.pop(key, None)
+            # The copy already costs O(fields), so resum here to shed floating-point drift
+            self.coherence_total = sum(f.coherence_score for f in snapshots.values())
+            self.field_snapshots = snapshots
+    
+    def reader_locks(self):
+        """Locks a reader takes: none with snapshot reads, the ocean locks otherwise"""
+        return [] if self.snapshot_reads else [self.lock, self.graph_lock]
+    
+    def retire_field(self, key: WindowKey) -> List[IntelligencePacket]:
+        """Remove a window's field, returning the packets no other window holds (caller holds self.lock)"""
+        retired = self.fields.pop(key)
+        with retired.lock:
+            retired.removed = True
+        self.swap_field_snapshots(remove=[key])
+        policy = self.windowing.by_code[key[0]]
+        policy.discard(key)
+        return policy.owned(key, retired.packets)
+    
+    def recent_packets(self, count: int,
+                       field_type: Optional[IntelligenceFieldType] = None) -> List[IntelligencePacket]:
+        """The `count` newest packets, optionally of one field type"""
+        with self.lock:
+            return self.recent.last(count, self.all_packets, field_type)
+    
+    def packets_since(self, timestamp: float,
+                      field_type: Optional[IntelligenceFieldType] = None) -> List[IntelligencePacket]:
+        """Recent packets stamped at or after `timestamp` (bounded by the ring capacity)"""
+        with self.lock:
+            return self.recent.since(timestamp, self.all_packets, field_type)
+    
+    def recent_windows(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Summaries of the most recently expired windows, newest last"""
+        with self.lock:
+            return list(itertools.islice(reversed(self.finalized_windows), limit))[::-1]
+    
+    # ---------- Retention (callers hold self.lock) ----------
+    
+    def expire_fields(self, now: float):
+        """Finalize closed windows older than their retention age and release their packets"""
+        default_age = self.retention.max_field_age
+        expired = []
+        for key in self.fields:
+            policy = self.windowing.by_code[key[0]]
+            max_age = default_age if policy.max_age is None else policy.max_age
+            if max_age is not None:
+                start, end = policy.bounds(key)
+                if now >= end and now - start > max_age:
+                    expired.append((key, start, end))
+        
+        for key, start, end in expired:
+            final = self.fields[key]
+            self.finalized_windows.append({
+                'field_id': final.field_id,
+                'field_type': final.field_type.value,
+                'window': self.windowing.by_code[key[0]].kind,
+                'start': start,
+                'end': end,
+                'packet_count': len(final.packets),
+                'coherence': final.coherence_score,
+                'patterns': sorted(final.emergence_patterns)
+            })
+            self.release_packets(self.retire_field(key))
+            self.ocean_metrics['expired_fields'] += 1
+    
+    def enforce_packet_cap(self):
+        """Evict the oldest fields (or the oldest packets of a field) over the packet cap"""
+        cap = self.retention.max_packets
+        if cap is None:
+            return
+        
+        while len(self.all_packets) > cap and self.fields:
+            excess = len(self.all_packets) - cap
+            # Not insertion order: a late packet reopens an older window at the end of
+            # self.fields, and owned() is only right when windows retire oldest first
+            oldest_key = min(self.fields, key=lambda key: self.windowing.bounds(key)[0])
+            oldest = self.fields[oldest_key]
+            with oldest.lock:
+                if len(oldest.packets) <= excess and len(self.fields) > 1:
+                    evicted = oldest.packets
+                else:
+                    # Trim in chunks so repeated inserts do not shift the list every time
+                    evicted = oldest.evict_oldest(max(excess, cap // 20, 1))
+                    self.publish_field(oldest)
+                emptied = evicted is oldest.packets or not oldest.packets
+            
+            if emptied:
+                self.retire_field(oldest_key)
+                self.ocean_metrics['evicted_fields'] += 1
+            self.release_packets(self.windowing.by_code[oldest_key[0]].owned(oldest_key, evicted))
+    
+    def enforce_graph_cap(self):
+        """Evict least recently used graph nodes over the node cap"""
+        cap = self.retention.max_graph_nodes
+        if cap is None:
+            return
+        
+        with self.graph_lock:
+            while len(self.graph_recency) > cap:
+                node_id, _ = self.graph_recency.popitem(last=False)
+                self.packet_graph.remove_node(node_id)
+                self.ocean_metrics['evicted_graph_nodes'] += 1
+    
+    def release_packets(self, packets: List[IntelligencePacket]):
+        """Forget evicted packets and their graph edges"""
+        with self.graph_lock:
+            for packet in packets:
+                if self.all_packets.pop(packet.id, None) is not None:
+                    self.ocean_metrics['evicted_packets'] += 1
+                if self.graph_recency.pop(packet.id, None) is not None:
+                    self.packet_graph.remove_node(packet.id)
+                if self.packet_store is not None:
+                    self.packet_store.release(packet)
+    
+    def touch_graph_node(self, node_id: str):
+        """Mark a graph node as most recently used (caller holds self.graph_lock)"""
+        self.graph_recency[node_id] = True
+        self.graph_recency.move_to_end(node_id)
+    
+    # ---------- Graph analytics ----------
+    
+    def graph_snapshot(self) -> GraphSnapshot:
+        """Merge pending graph changes and return arrays that can be queried without locks"""
+        with self.graph_lock:
+            return self.packet_graph.snapshot()
+    
+    def packet_lineage(self, packet_id: str, max_depth: Optional[int] = None) -> Dict[str, List[str]]:
+        """Ancestors and descendants of a packet, e.g. what led to a diagnostic finding"""
+        return self.graph_snapshot().lineage(packet_id, max_depth)
+    
+    def graph_report(self, top_k: int = 5) -> Dict[str, Any]:
+        """Component structure and the most central packets, cheap enough for every report"""
+        start = time.perf_counter()
+        graph = self.graph_snapshot()
+        report = {
+            'nodes': graph.node_count,
+            'edges': graph.edge_count,
+            'components': graph.components(),
+            'top_central': graph.top_central(top_k)
+        }
+        report['query_seconds'] = time.perf_counter() - start
+        return report
+    
+    def create_wave(self, source_packets: List[IntelligencePacket]) -> List[IntelligencePacket]:
+        """
+        Create a 'wave' of intelligence by correlating every pair of source packets.
+        Waves propagate through the ocean creating new intelligence.
+        """
+        if self.wave_engine == "pool":
+            pairs = self.find_wave_pairs_pool(source_packets)
+        else:
+            pairs = self.find_wave_pairs_vectorized(source_packets)
+        
+        wave_packets = []
+        for p1, p2 in pairs:
+            correlation_id = stable_packet_id(p1.id, p2.id)
+            with self.lock:
+                seen = self.is_duplicate(correlation_id)
+                if seen:
+                    self.ocean_metrics['duplicate_packets'] += 1
+            if seen:
+                continue  # Pair already correlated: the packet is not even built
+            result = self.build_correlation_packet(p1, p2, correlation_id)
+            if self.add_packet(result):
+                wave_packets.append(result)
+        
+        return wave_packets
+    
+    def find_wave_pairs_pool(self, source_packets: List[IntelligencePacket]) -> List[Tuple[IntelligencePacket, IntelligencePacket]]:
+        """Find correlating pairs with one thread-pool task per pair"""
+        def process_packet_interactions(p1: IntelligencePacket, p2: IntelligencePacket):
             """Process interaction between two packets"""
             if p1.field_type != p2.field_type:
                 # Cross-field correlation can create new insights
-                if p1.confidence * p2.confidence > 0.7:  # High confidence correlation
-                    correlation_id = hashlib.md5(f"{p1.id}_{p2.id}".encode()).hexdigest()[:12]
-                    
-                    return IntelligencePacket(
-                        id=correlation_id,
-                        timestamp=time.time(),
-                        source_agent="ocean_correlator",
-                        field_type=IntelligenceFieldType.CORRELATION,
-                        confidence=p1.confidence * p2.confidence,
-                        data={
-                            'correlation_type': f"{p1.field_type.value}_to_{p2.field_type.value}",
-                            'insight': self.generate_correlation_insight(p1, p2),
-                            'strength': p1.confidence * p2.confidence
-                        },
-                        parent_packets=[p1.id, p2.id]
-                    )
+                if p1.confidence * p2.confidence > WAVE_CORRELATION_THRESHOLD:
+                    return (p1, p2)
             return None
         
         # Process all packet pairs in parallel
@@ -437,92 +2364,1205 @@ class IntelligenceOcean:
                 future = self.executor.submit(process_packet_interactions, p1, p2)
                 futures.append(future)
         
-        # Collect results
-        for future in futures:
-            result = future.result()
-            if result:
-                wave_packets.append(result)
-                self.add_packet(result)
+        # Collect results
+        return [pair for pair in (future.result() for future in futures) if pair]
+    
+    def find_wave_pairs_vectorized(self, source_packets: List[IntelligencePacket]) -> List[Tuple[IntelligencePacket, IntelligencePacket]]:
+        """
+        Find correlating pairs with NumPy outer products over packed field-type codes
+        and confidences. Rows are processed in blocks so large waves stay bounded in
+        memory, and pairs come out in the same (i < j) order as the pool path.
+        """
+        count = len(source_packets)
+        if count < 2:
+            return []
+        
+        types = np.fromiter((FIELD_TYPE_CODES[p.field_type] for p in source_packets),
+                            dtype=np.int8, count=count)
+        confidences = np.fromiter((p.confidence for p in source_packets),
+                                  dtype=np.float64, count=count)
+        columns = np.arange(count)
+        block_rows = max(1, WAVE_BLOCK_ELEMENTS // count)
+        
+        pairs = []
+        for start in range(0, count - 1, block_rows):
+            stop = min(start + block_rows, count - 1)
+            rows = columns[start:stop, None]
+            mask = (
+                (columns[None, :] > rows)
+                & (types[start:stop, None] != types[None, :])
+                & (np.multiply.outer(confidences[start:stop], confidences) > WAVE_CORRELATION_THRESHOLD)
+            )
+            row_idx, col_idx = np.nonzero(mask)
+            pairs.extend(
+                (source_packets[i], source_packets[j])
+                for i, j in zip((row_idx + start).tolist(), col_idx.tolist())
+            )
+        
+        return pairs
+    
+    def build_correlation_packet(self, p1: IntelligencePacket, p2: IntelligencePacket,
+                                 correlation_id: Optional[str] = None) -> IntelligencePacket:
+        """Build the CORRELATION packet for a cross-field, high-confidence pair"""
+        strength = p1.confidence * p2.confidence
+        correlation_type, insight = CORRELATION_TABLE[p1.field_type, p2.field_type]
+        
+        return IntelligencePacket(
+            id=correlation_id or stable_packet_id(p1.id, p2.id),  # The same pair always yields the same id
+            timestamp=time.time(),
+            source_agent="ocean_correlator",
+            field_type=IntelligenceFieldType.CORRELATION,
+            confidence=strength,
+            data={
+                'correlation_type': correlation_type,
+                'insight': insight,
+                'strength': strength
+            },
+            parent_packets=[p1.id, p2.id]
+        )
+    
+    def shutdown(self):
+        """Release the ocean's worker pools"""
+        self.executor.shutdown(wait=True)
+    
+    def generate_correlation_insight(self, p1: IntelligencePacket, p2: IntelligencePacket) -> str:
+        """Generate insight from packet correlation"""
+        return CORRELATION_TABLE[p1.field_type, p2.field_type][1]
+    
+    def detect_emergence(self) -> List[Dict[str, Any]]:
+        """Detect emergent patterns across all fields"""
+        emergence_patterns = []
+        
+        with contextlib.ExitStack() as held:
+            for lock in self.reader_locks():
+                held.enter_context(lock)
+            
+            # Look for fields with high coherence
+            high_coherence_fields = [
+                f for f in list(self.field_snapshots.values())
+                if f.coherence_score > 0.8 and f.packet_count > 5
+            ]
+            
+            for field in high_coherence_fields:
+                if field.emergence_patterns:
+                    emergence_patterns.append({
+                        'field_id': field.field_id,
+                        'field_type': field.field_type.value,
+                        'coherence': field.coherence_score,
+                        'patterns': field.emergence_patterns,
+                        'delta': field.emergence_delta,
+                        'packet_count': field.packet_count
+                    })
+        
+        with self.stats_lock:
+            self.ocean_metrics['emergence_events'] += len(emergence_patterns)
+        return emergence_patterns
+    
+    def calculate_ocean_metrics(self) -> Dict[str, Any]:
+        """Calculate overall ocean health and intelligence metrics"""
+        with contextlib.ExitStack() as held:
+            for lock in self.reader_locks():
+                held.enter_context(lock)
+            
+            # Running aggregates, so this is O(1) however large the ocean grows
+            field_count = len(self.field_snapshots)
+            avg_coherence = self.coherence_total / field_count if field_count else 0
+            
+            # Calculate graph connectivity (the degree sum counts each edge from both ends)
+            total_connections = self.packet_graph.degree_total
+            node_count = len(self.packet_graph)
+            avg_connections = total_connections / node_count if node_count else 0
+            
+            with self.stats_lock:
+                self.ocean_metrics.update({
+                    'average_coherence': avg_coherence,
+                    'average_connections': avg_connections,
+                    'field_count': field_count,
+                    'packet_count': len(self.all_packets),
+                    'graph_nodes': node_count,
+                    'graph_density': (total_connections / (node_count * (node_count - 1))
+                                      if node_count > 1 else 0),
+                    'resident_memory_bytes': process_resident_memory()
+                })
+                
+                return self.ocean_metrics.copy()
+
+# ================== Packet Journal ==================
+
+class PacketJournal:
+    """
+    Append-only journal of ocean packets in numbered segment files, plus periodic
+    snapshots of the live packets. Each record is framed as (length, crc32, payload)
+    so a torn tail left by a crash is detected and cut off; parent ids travel with
+    each packet and are the graph edges. Replay memory-maps the latest committed
+    snapshot and the segments written after it.
+    """
+    
+    FRAME = struct.Struct('<II')  # payload length, crc32
+    RECORD = struct.Struct('<ddBHHII')  # timestamp, confidence, field code, id/agent/parents/data lengths
+    PARENT_SEPARATOR = '\x1f'
+    
+    def __init__(self, directory: str, segment_bytes: int = 64 << 20,
+                 snapshot_records: int = 500_000):
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self.snapshot_records = snapshot_records  # Records appended before a snapshot is due
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment = 0
+        self.file = None
+        self.segment_size = 0
+        self.records_since_snapshot = 0
+        self.unsealed: deque = deque()  # Rotated-out segment files awaiting fsync and close
+        
+        decoder = LogDecoder(typed=False)
+        self.fast_loads, self.fast_errors = decoder.loads, decoder.errors
+        self.agent_names: Dict[bytes, str] = {}  # Shared source_agent strings for replayed packets
+    
+    # ---------- Layout ----------
+    
+    def segment_path(self, segment: int) -> Path:
+        return self.directory / f"segment-{segment:08d}.journal"
+    
+    def snapshot_path(self, segment: int) -> Path:
+        return self.directory / f"snapshot-{segment:08d}.journal"
+    
+    def snapshot_meta_path(self, segment: int) -> Path:
+        return self.directory / f"snapshot-{segment:08d}.json"
+    
+    def numbered(self, prefix: str, suffix: str) -> List[int]:
+        return sorted(int(path.name[len(prefix):-len(suffix)])
+                      for path in self.directory.glob(f"{prefix}*{suffix}"))
+    
+    def latest_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Metadata of the newest snapshot whose metadata file (its commit marker) exists"""
+        for segment in reversed(self.numbered('snapshot-', '.json')):
+            try:
+                with open(self.snapshot_meta_path(segment)) as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                continue
+        return None
+    
+    # ---------- Encoding ----------
+    
+    def encode(self, packet: IntelligencePacket) -> bytes:
+        packet_id = packet.id.encode()
+        agent = packet.source_agent.encode()
+        parents = self.PARENT_SEPARATOR.join(packet.parent_packets).encode()
+        data = json.dumps(packet.data, separators=(',', ':'), default=float).encode()
+        payload = b''.join((
+            self.RECORD.pack(packet.timestamp, packet.confidence, FIELD_TYPE_CODES[packet.field_type],
+                             len(packet_id), len(agent), len(parents), len(data)),
+            packet_id, agent, parents, data))
+        return self.FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+    
+    def decode(self, payload: bytes) -> IntelligencePacket:
+        timestamp, confidence, code, id_len, agent_len, parents_len, data_len = \
+            self.RECORD.unpack_from(payload)
+        id_end = self.RECORD.size + id_len
+        agent_end = id_end + agent_len
+        parents_end = agent_end + parents_len
+        
+        agent_bytes = payload[id_end:agent_end]
+        agent = self.agent_names.get(agent_bytes)
+        if agent is None:
+            agent = self.agent_names[agent_bytes] = sys.intern(agent_bytes.decode())
+        parents = payload[agent_end:parents_end].decode() if parents_len else None
+        data = payload[parents_end:parents_end + data_len]
+        try:
+            data = self.fast_loads(data)
+        except self.fast_errors:
+            data = json.loads(data)  # Non-finite floats such as an infinite rate_ratio
+        return IntelligencePacket(
+            payload[self.RECORD.size:id_end].decode(),
+            timestamp,
+            agent,
+            FIELD_TYPES_BY_CODE[code],
+            confidence,
+            data,
+            parents.split(self.PARENT_SEPARATOR) if parents else [],
+            []
+        )
+    
+    def read_file(self, path: Path) -> Iterator[Tuple[int, IntelligencePacket]]:
+        """(end offset, packet) for each intact record; stops at the first torn one"""
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                offset, size = 0, len(mapped)
+                frame_size = self.FRAME.size
+                while offset + frame_size <= size:
+                    length, crc = self.FRAME.unpack_from(mapped, offset)
+                    end = offset + frame_size + length
+                    if end > size:
+                        break
+                    payload = mapped[offset + frame_size:end]
+                    if zlib.crc32(payload) != crc:
+                        break
+                    yield end, self.decode(payload)
+                    offset = end
+    
+    # ---------- Replay ----------
+    
+    def replay(self) -> Tuple[Optional[Dict[str, Any]], Iterator[IntelligencePacket],
+                              Iterator[IntelligencePacket]]:
+        """
+        The newest committed snapshot's metadata (or None), an iterator over its packets
+        and an iterator over the packets of every later segment. Must run before open().
+        """
+        meta = self.latest_snapshot()
+        first_segment = meta['segment'] if meta else 0
+        
+        def snapshot_packets() -> Iterator[IntelligencePacket]:
+            if meta:
+                for _, packet in self.read_file(self.snapshot_path(first_segment)):
+                    yield packet
+        
+        def tail_packets() -> Iterator[IntelligencePacket]:
+            for segment in self.numbered('segment-', '.journal'):
+                if segment < first_segment:
+                    continue
+                valid_end = 0
+                for valid_end, packet in self.read_file(self.segment_path(segment)):
+                    yield packet
+                self.cut_torn_tail(self.segment_path(segment), valid_end)
+        
+        return meta, snapshot_packets(), tail_packets()
+    
+    def cut_torn_tail(self, path: Path, valid_end: int):
+        """Drop bytes after the last intact record so appends resume on a record boundary"""
+        if path.stat().st_size > valid_end:
+            logger.info(f"Truncating torn journal tail in {path.name} at {valid_end} bytes")
+            with open(path, 'r+b') as f:
+                f.truncate(valid_end)
+    
+    # ---------- Appending ----------
+    
+    def open(self):
+        """Resume appending to the newest segment"""
+        segments = self.numbered('segment-', '.journal')
+        meta = self.latest_snapshot()
+        self.segment = max(segments[-1] if segments else 0, meta['segment'] if meta else 0)
+        self.file = open(self.segment_path(self.segment), 'ab', buffering=1 << 20)
+        self.segment_size = self.file.tell()
+    
+    def append(self, packet: IntelligencePacket):
+        record = self.encode(packet)
+        self.file.write(record)
+        self.segment_size += len(record)
+        self.records_since_snapshot += 1
+        if self.segment_size >= self.segment_bytes:
+            self.rotate()
+    
+    def rotate(self) -> int:
+        """
+        Start the next segment and return its number. The previous file is only queued
+        for seal(), so callers holding the ocean lock never wait on an fsync.
+        """
+        self.unsealed.append(self.file)
+        self.segment += 1
+        self.file = open(self.segment_path(self.segment), 'ab', buffering=1 << 20)
+        self.segment_size = 0
+        return self.segment
+    
+    def seal(self):
+        """Flush, fsync and close rotated-out segments; safe to call without the ocean lock"""
+        while self.unsealed:
+            sealed = self.unsealed.popleft()
+            sealed.flush()
+            os.fsync(sealed.fileno())
+            sealed.close()
+    
+    def flush(self):
+        if self.file is not None:
+            self.file.flush()
+    
+    def snapshot_due(self) -> bool:
+        return self.records_since_snapshot >= self.snapshot_records
+    
+    def write_snapshot(self, segment: int, packets: List[IntelligencePacket],
+                       counters: Dict[str, Any]):
+        """
+        Write the live packets as of the start of `segment`, commit the snapshot with
+        its metadata file, then delete the segments and snapshots it replaces.
+        """
+        self.records_since_snapshot = 0
+        self.seal()  # Close rotated-out segments before the snapshot replaces them
+        path = self.snapshot_path(segment)
+        with open(path, 'wb', buffering=1 << 20) as f:
+            for packet in packets:
+                f.write(self.encode(packet))
+            f.flush()
+            os.fsync(f.fileno())
+        
+        write_file_atomic(self.snapshot_meta_path(segment), json.dumps({
+            'segment': segment,
+            'packets': len(packets),
+            'ocean_metrics': counters,
+            'saved_at': time.time()
+        }))
+        
+        for old in self.numbered('segment-', '.journal'):
+            if old < segment:
+                self.segment_path(old).unlink(missing_ok=True)
+        for old in self.numbered('snapshot-', '.json'):
+            if old < segment:
+                self.snapshot_meta_path(old).unlink(missing_ok=True)
+                self.snapshot_path(old).unlink(missing_ok=True)
+        logger.info(f"Journal snapshot at segment {segment}: {len(packets)} packets")
+    
+    def close(self):
+        self.seal()
+        if self.file is not None:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+            self.file = None
+
+# ================== Log Following ==================
+
+def write_file_atomic(path: Path, text: str, durable: bool = True):
+    """Replace path with text so readers see the old or the new file, never a partial one"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+        if durable:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+class LogFollower:
+    """
+    Follows a log file across logrotate renames and truncations.
+    The file is identified by (device, inode). At EOF, detect_change() reports a rename
+    once the old file is fully read, or a truncation when the file shrank below the
+    read position. The processed offset is checkpointed atomically (temp file, fsync,
+    os.replace) so a restart resumes exactly after the last processed line.
+    """
+    
+    def __init__(self, path: Path, checkpoint_path: Optional[Path] = None,
+                 checkpoint_interval: float = 1.0):
+        self.path = Path(path)
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.file = None
+        self.identity: Optional[Tuple[int, int]] = None
+        self.position = 0           # Bytes read from the open file
+        self.committed_offset = 0   # Bytes processed by the sidecar
+        self.last_checkpoint = 0.0
+    
+    async def open(self, default_offset: int = 0):
+        """Open the log, resuming from the checkpoint when it still matches a file"""
+        checkpoint = self.load_checkpoint()
+        target, offset = self.path, default_offset
+        
+        if checkpoint is not None:
+            saved_identity = (checkpoint['device'], checkpoint['inode'])
+            stat = os.stat(self.path)
+            if (stat.st_dev, stat.st_ino) == saved_identity:
+                # Same file; a checkpoint past EOF means it was truncated while we were down
+                offset = checkpoint['offset'] if checkpoint['offset'] <= stat.st_size else 0
+            else:
+                # Rotated while we were down: finish the renamed file first if it is still around
+                rotated = self.find_rotated(saved_identity)
+                if rotated is not None:
+                    target, offset = rotated, checkpoint['offset']
+                    logger.info(f"Resuming rotated log {rotated} at offset {offset}")
+                else:
+                    offset = 0
+        
+        await self.open_file(target, offset)
+        self.committed_offset = offset
+    
+    async def open_file(self, path: Path, offset: int):
+        self.file = await aiofiles.open(path, 'rb')
+        await self.file.seek(offset)
+        stat = os.fstat(self.file.fileno())
+        self.identity = (stat.st_dev, stat.st_ino)
+        self.position = offset
+    
+    def find_rotated(self, identity: Tuple[int, int]) -> Optional[Path]:
+        """Find a renamed copy of the log (e.g. app.log.1) by device and inode"""
+        for candidate in self.path.parent.glob(self.path.name + '.*'):
+            try:
+                stat = os.stat(candidate)
+            except OSError:
+                continue
+            if (stat.st_dev, stat.st_ino) == identity:
+                return candidate
+        return None
+    
+    async def read(self, size: int) -> bytes:
+        chunk = await self.file.read(size)
+        self.position += len(chunk)
+        return chunk
+    
+    def detect_change(self) -> Optional[str]:
+        """At EOF: 'rotated', 'truncated' or None if the file is unchanged"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None  # Renamed away and not recreated yet
+        
+        if (stat.st_dev, stat.st_ino) != self.identity:
+            # Only switch once everything written to the old file has been read
+            if os.fstat(self.file.fileno()).st_size > self.position:
+                return None
+            return 'rotated'
+        if stat.st_size < self.position:
+            return 'truncated'
+        return None
+    
+    async def reopen(self):
+        await self.file.close()
+        await self.open_file(self.path, 0)
+    
+    async def rewind(self):
+        await self.file.seek(0)
+        self.position = 0
+    
+    def commit(self, offset: int):
+        """Record the processed offset, checkpointing at most once per interval"""
+        self.committed_offset = offset
+        if time.monotonic() - self.last_checkpoint >= self.checkpoint_interval:
+            self.save_checkpoint()
+    
+    def load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        if self.checkpoint_path is None or not self.checkpoint_path.exists():
+            return None
+        try:
+            checkpoint = json.loads(self.checkpoint_path.read_text())
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable log checkpoint {self.checkpoint_path}: {e}")
+            return None
+        if checkpoint.get('path') != str(self.path.resolve()):
+            return None
+        return checkpoint
+    
+    def save_checkpoint(self):
+        """Write the checkpoint atomically: temp file, fsync, rename over the old one"""
+        self.last_checkpoint = time.monotonic()
+        if self.checkpoint_path is None or self.identity is None:
+            return
+        
+        checkpoint = {
+            'path': str(self.path.resolve()),
+            'device': self.identity[0],
+            'inode': self.identity[1],
+            'offset': self.committed_offset,
+            'saved_at': time.time()
+        }
+        write_file_atomic(self.checkpoint_path, json.dumps(checkpoint))
+    
+    async def close(self):
+        if self.file is not None:
+            self.save_checkpoint()
+            await self.file.close()
+            self.file = None
+
+# ================== Log Decoding ==================
+
+class LogFieldAccess:
+    """Dict-style access to typed log records, so agents can use either form"""
+    
+    __slots__ = ()
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None)
+        return default if value is None else value
+    
+    def __contains__(self, key: str) -> bool:
+        return getattr(self, key, None) is not None
+    
+    def __getitem__(self, key: str) -> Any:
+        value = getattr(self, key, None)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+if msgspec is not None:
+    class MemoryStats(msgspec.Struct, LogFieldAccess):
+        """Typed `memory` section of a log line"""
+        used_percent: Optional[float] = None
+    
+    class LogRecord(msgspec.Struct, LogFieldAccess):
+        """Typed log line; `raw` holds lines that are not JSON or do not match the schema"""
+        timestamp: Optional[float] = None
+        cpu_temp: Optional[float] = None
+        memory: Optional[MemoryStats] = None
+        response_time: Optional[float] = None
+        access_type: Optional[str] = None
+        user: Optional[str] = None
+        host: Optional[str] = None
+        raw: Optional[str] = None
+else:
+    class MemoryStats(LogFieldAccess):
+        """Typed `memory` section of a log line"""
+        
+        __slots__ = ('used_percent',)
+        
+        def __init__(self, used_percent: Optional[float] = None):
+            self.used_percent = used_percent
+        
+        def __repr__(self):
+            return f"MemoryStats(used_percent={self.used_percent!r})"
+    
+    class LogRecord(LogFieldAccess):
+        """Typed log line; `raw` holds lines that are not JSON or do not match the schema"""
+        
+        __slots__ = ('timestamp', 'cpu_temp', 'memory', 'response_time', 'access_type', 'user',
+                     'host', 'raw')
+        
+        def __init__(self, timestamp: Optional[float] = None, cpu_temp: Optional[float] = None,
+                     memory: Optional[MemoryStats] = None, response_time: Optional[float] = None,
+                     access_type: Optional[str] = None, user: Optional[str] = None,
+                     host: Optional[str] = None, raw: Optional[str] = None):
+            self.timestamp = timestamp
+            self.cpu_temp = cpu_temp
+            self.memory = memory
+            self.response_time = response_time
+            self.access_type = access_type
+            self.user = user
+            self.host = host
+            self.raw = raw
+        
+        def __repr__(self):
+            fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__
+                               if getattr(self, name) is not None)
+            return f"LogRecord({fields})"
+
+def _typed_float(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise TypeError(f"expected a number, got {type(value).__name__}")
+    return float(value)
+
+def _typed_str(value: Any) -> Optional[str]:
+    if value is not None and not isinstance(value, str):
+        raise TypeError(f"expected a string, got {type(value).__name__}")
+    return value
+
+def record_from_entry(entry: Dict[str, Any], line: str) -> LogRecord:
+    """Build a typed record from a decoded dict, with the same rules as the msgspec schema"""
+    try:
+        memory = entry.get('memory')
+        if memory is not None and not isinstance(memory, dict):
+            raise TypeError("expected an object for memory")
+        return LogRecord(
+            timestamp=_typed_float(entry.get('timestamp')),
+            cpu_temp=_typed_float(entry.get('cpu_temp')),
+            memory=(MemoryStats(used_percent=_typed_float(memory.get('used_percent')))
+                    if memory is not None else None),
+            response_time=_typed_float(entry.get('response_time')),
+            access_type=_typed_str(entry.get('access_type')),
+            user=_typed_str(entry.get('user')),
+            host=_typed_str(entry.get('host')),
+            raw=_typed_str(entry.get('raw'))
+        )
+    except TypeError:
+        return LogRecord(raw=line)
+
+JSON_BACKENDS = [name for name, module in (('msgspec', msgspec), ('orjson', orjson)) if module] + ['json']
+
+class LogDecoder:
+    """
+    Decodes sidecar log lines with the fastest available JSON backend
+    (msgspec, then orjson, then the stdlib). Typed mode yields LogRecord structs
+    holding only the known fields; untyped mode yields dicts as before.
+    Lines that are not JSON objects become {'raw': line} / LogRecord(raw=line).
+    """
+    
+    def __init__(self, typed: bool = True, backend: Optional[str] = None):
+        backend = backend or JSON_BACKENDS[0]
+        if backend not in JSON_BACKENDS:
+            raise ValueError(f"JSON backend {backend!r} is not available (have {JSON_BACKENDS})")
+        self.backend = backend
+        self.typed = typed
+        
+        if backend == 'msgspec':
+            self.loads = msgspec.json.Decoder().decode
+            self.errors = (msgspec.DecodeError,)
+            self.record_decoder = msgspec.json.Decoder(LogRecord).decode
+        elif backend == 'orjson':
+            self.loads = orjson.loads
+            self.errors = (orjson.JSONDecodeError,)
+            self.record_decoder = None
+        else:
+            self.loads = json.loads
+            self.errors = (json.JSONDecodeError,)
+            self.record_decoder = None
+    
+    def decode(self, line: str) -> Any:
+        if not line.startswith('{'):
+            return LogRecord(raw=line) if self.typed else {'raw': line}
+        
+        if self.typed and self.record_decoder is not None:
+            try:
+                return self.record_decoder(line)
+            except self.errors:
+                return LogRecord(raw=line)
+        
+        try:
+            entry = self.loads(line)
+        except self.errors:
+            entry = {'raw': line}
+        return record_from_entry(entry, line) if self.typed else entry
+
+# ================== Synthetic Load ==================
+
+SYNTHETIC_LINE_TEMPLATE = (
+    '{"timestamp": %.6f, "cpu_temp": %.4f, "memory": {"used_percent": %.4f}, '
+    '"response_time": %.4f, "access_type": "%s", "user": "%s"}\n'
+)
+SYNTHETIC_ACCESS_TYPES = ['read', 'write', 'execute']
+SYNTHETIC_USERS = ['system', 'user', 'daemon']
+
+class SyntheticLoadGenerator:
+    """
+    Appends synthetic log lines at a target rate through one persistent file handle.
+    Lines are generated with NumPy in per-tick batches, so it can drive the sidecar
+    at 100k lines/s. Burst profiles:
+      steady - constant `rate`
+      sine   - rate swings between rate/burst_factor and rate*burst_factor over burst_period
+      burst  - rate*burst_factor for the first 20% of every burst_period, `rate` otherwise
+    A fraction `anomaly_rate` of lines carry a CPU temperature and response-time spike.
+    """
+    
+    BURST_PROFILES = ('steady', 'sine', 'burst')
+    
+    def __init__(self, log_file: str, rate: float = 1000.0, burst_profile: str = 'steady',
+                 burst_factor: float = 5.0, burst_period: float = 10.0,
+                 anomaly_rate: float = 0.0, tick: float = 0.01, seed: Optional[int] = None):
+        if burst_profile not in self.BURST_PROFILES:
+            raise ValueError(f"Unknown burst profile {burst_profile!r}")
+        self.log_file = Path(log_file)
+        self.rate = rate
+        self.burst_profile = burst_profile
+        self.burst_factor = burst_factor
+        self.burst_period = burst_period
+        self.anomaly_rate = anomaly_rate
+        self.tick = tick
+        self.rng = np.random.default_rng(seed)
+        self.running = False
+        self.stats = {'lines_written': 0, 'anomalies_injected': 0, 'batches_written': 0}
+    
+    def rate_at(self, elapsed: float) -> float:
+        """Target lines per second at `elapsed` seconds into the run"""
+        if self.burst_profile == 'sine':
+            phase = np.sin(2 * np.pi * elapsed / self.burst_period)
+            return self.rate * self.burst_factor ** phase
+        if self.burst_profile == 'burst':
+            in_burst = (elapsed % self.burst_period) < 0.2 * self.burst_period
+            return self.rate * self.burst_factor if in_burst else self.rate
+        return self.rate
+    
+    def format_batch(self, count: int, start_time: float, end_time: float) -> str:
+        """Render `count` log lines with timestamps spread over [start_time, end_time)"""
+        rng = self.rng
+        timestamps = np.linspace(start_time, end_time, count, endpoint=False)
+        cpu_temps = 45 + rng.normal(0, 5, count)
+        memory = 60 + rng.normal(0, 10, count)
+        response_times = 150 + rng.normal(0, 30, count)
+        access_types = rng.integers(0, len(SYNTHETIC_ACCESS_TYPES), count)
+        users = rng.integers(0, len(SYNTHETIC_USERS), count)
+        
+        if self.anomaly_rate > 0:
+            anomalies = rng.random(count) < self.anomaly_rate
+            cpu_temps[anomalies] += rng.uniform(25, 45, int(anomalies.sum()))
+            response_times[anomalies] *= rng.uniform(4, 10, int(anomalies.sum()))
+            self.stats['anomalies_injected'] += int(anomalies.sum())
+        
+        return ''.join(
+            SYNTHETIC_LINE_TEMPLATE % (ts, cpu, mem, rt, SYNTHETIC_ACCESS_TYPES[a], SYNTHETIC_USERS[u])
+            for ts, cpu, mem, rt, a, u in zip(
+                timestamps.tolist(), cpu_temps.tolist(), memory.tolist(),
+                response_times.tolist(), access_types.tolist(), users.tolist()
+            )
+        )
+    
+    async def run(self, duration: Optional[float] = None):
+        """Write batches every tick until stopped or `duration` seconds have passed"""
+        self.running = True
+        started = time.monotonic()
+        last_tick = started
+        owed = 0.0  # Fractional lines carried between ticks
+        
+        async with aiofiles.open(self.log_file, 'a', buffering=1 << 20) as f:
+            while self.running:
+                now = time.monotonic()
+                elapsed = now - started
+                if duration is not None and elapsed >= duration:
+                    break
+                
+                owed += self.rate_at(elapsed) * (now - last_tick)
+                count = int(owed)
+                if count:
+                    owed -= count
+                    wall = time.time()
+                    await f.write(self.format_batch(count, wall - (now - last_tick), wall))
+                    await f.flush()
+                    self.stats['lines_written'] += count
+                    self.stats['batches_written'] += 1
+                last_tick = now
+                
+                await asyncio.sleep(max(0.0, self.tick - (time.monotonic() - now)))
+        
+        self.running = False
+        elapsed = time.monotonic() - started
+        self.stats['achieved_rate'] = self.stats['lines_written'] / elapsed if elapsed else 0.0
+        logger.info(f"Load generator stopped: {json.dumps(self.stats)}")
+
+# ================== Sharded Ingestion ==================
+
+def shard_worker(shard_index: int, line_queue: multiprocessing.Queue,
+                 packet_queue: multiprocessing.Queue, json_backend: Optional[str],
+                 typed_entries: bool, route_entries: bool):
+    """Worker process: decode, route and run one agent set over incoming line batches"""
+    decoder = LogDecoder(typed=typed_entries, backend=json_backend)
+    PACKET_IDS.reset(node=shard_index + 1)  # Forked workers would otherwise repeat the parent's ids
+    agents = create_agent_swarm()
+    router = AgentRouter(agents, enabled=route_entries)
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            message = line_queue.get()
+            if message is None:
+                break
+            sequence, lines = message
+            log_entries = [decoder.decode(line) for line in lines]
+            per_line = loop.run_until_complete(run_agent_batch(agents, router, log_entries))
+            packet_queue.put((shard_index, sequence, per_line))
+    finally:
+        loop.close()
+
+class ShardPool:
+    """
+    Agent sets in N worker processes, fed over pipe-based queues. Lines are
+    partitioned by shard_key so each key always reaches the same worker and its agent
+    state; lines without the key are spread round-robin. Results are handed back in
+    batch order so the coordinator only commits offsets that every shard has finished.
+    """
+    
+    SHARD_KEYS = ('user', 'host', 'field_type')
+    
+    def __init__(self, shards: int, shard_key: str = 'user', json_backend: Optional[str] = None,
+                 typed_entries: bool = True, route_entries: bool = True, max_inflight: int = 8):
+        if shards < 1:
+            raise ValueError("ShardPool needs at least one shard")
+        if shard_key not in self.SHARD_KEYS:
+            raise ValueError(f"Unknown shard key: {shard_key}")
+        self.shards = shards
+        self.shard_key = shard_key
+        self.json_backend = json_backend
+        self.typed_entries = typed_entries
+        self.route_entries = route_entries
+        self.max_inflight = max_inflight
+        
+        # user/host are read off the raw line with a regex (the raw JSON token is hashed,
+        # which is just as stable); field_type depends on which agents a line routes to,
+        # so only that key makes the coordinator decode lines as well as the workers
+        self.key_pattern = (re.compile(rf'"{shard_key}"\s*:\s*("(?:[^"\\]|\\.)*"|[^,}}\s]+)')
+                            if shard_key != 'field_type' else None)
+        self.decoder = LogDecoder(typed=typed_entries, backend=json_backend) if shard_key == 'field_type' else None
+        self.key_router = AgentRouter(create_agent_swarm()) if shard_key == 'field_type' else None
+        self.next_unkeyed = 0
         
-        return wave_packets
+        self.workers: List[multiprocessing.Process] = []
+        self.line_queues: List[multiprocessing.Queue] = []
+        self.packet_queue: Optional[multiprocessing.Queue] = None
+        self.next_sequence = 0
+        self.inflight: 'OrderedDict[int, List[int]]' = OrderedDict()  # sequence -> [shards left, end, lines]
     
-    def generate_correlation_insight(self, p1: IntelligencePacket, p2: IntelligencePacket) -> str:
-        """Generate insight from packet correlation"""
-        insights = {
-            ('hardware', 'performance'): "Hardware conditions affecting performance",
-            ('performance', 'security'): "Performance anomalies indicating security issues",
-            ('hardware', 'predictive'): "Hardware trends predicting future states",
-            ('security', 'behavior'): "Security events correlating with user behavior",
-            ('diagnostic', 'optimization'): "Diagnostic findings suggesting optimizations"
-        }
-        
-        key = (p1.field_type.value, p2.field_type.value)
-        reverse_key = (p2.field_type.value, p1.field_type.value)
+    def start(self):
+        """Launch the worker processes"""
+        self.packet_queue = multiprocessing.Queue()
+        for shard_index in range(self.shards):
+            line_queue = multiprocessing.Queue(maxsize=self.max_inflight)
+            worker = multiprocessing.Process(
+                target=shard_worker, name=f"sidecar-shard-{shard_index}", daemon=True,
+                args=(shard_index, line_queue, self.packet_queue, self.json_backend,
+                      self.typed_entries, self.route_entries))
+            worker.start()
+            self.line_queues.append(line_queue)
+            self.workers.append(worker)
+        logger.info(f"Started {self.shards} ingestion shards keyed by {self.shard_key}")
+    
+    def shard_for(self, line: str) -> int:
+        if self.key_router is not None:
+            agents = self.key_router.route(self.decoder.decode(line))
+            key = agents[0].field_type.value if agents else None
+        else:
+            match = self.key_pattern.search(line)
+            key = match.group(1) if match and match.group(1) != 'null' else None
         
-        return insights.get(key, insights.get(reverse_key, "Cross-domain correlation detected"))
+        if key is None:
+            self.next_unkeyed = (self.next_unkeyed + 1) % self.shards
+            return self.next_unkeyed
+        return hash(key) % self.shards
     
-    def detect_emergence(self) -> List[Dict[str, Any]]:
-        """Detect emergent patterns across all fields"""
-        emergence_patterns = []
+    async def submit(self, lines: List[str], end_position: int):
+        """Partition a batch across the shards, waiting off the event loop while a shard is full"""
+        partitions: List[List[str]] = [[] for _ in range(self.shards)]
+        for line in lines:
+            partitions[self.shard_for(line)].append(line)
         
-        with self.lock:
-            # Look for fields with high coherence
-            high_coherence_fields = [
-                f for f in self.fields.values() 
-                if f.coherence_score > 0.8 and len(f.packets) > 5
-            ]
+        sequence = self.next_sequence
+        self.next_sequence += 1
+        self.inflight[sequence] = [sum(1 for part in partitions if part), end_position, len(lines)]
+        for shard_index, part in enumerate(partitions):
+            if not part:
+                continue
+            while True:
+                try:
+                    self.line_queues[shard_index].put_nowait((sequence, part))
+                    break
+                except queue.Full:
+                    self.check_workers()
+                    await asyncio.sleep(0.005)
+    
+    def check_workers(self):
+        """Raise if a worker died, since its queue would never drain again"""
+        dead = [worker.name for worker in self.workers if not worker.is_alive()]
+        if dead:
+            raise RuntimeError(f"Ingestion shards exited: {', '.join(dead)}")
+    
+    def receive(self, block: bool) -> Optional[Tuple[int, int, List[List[IntelligencePacket]]]]:
+        """One shard result, waiting for it when block is set"""
+        while True:
+            try:
+                return self.packet_queue.get(block=block, timeout=1.0 if block else None)
+            except queue.Empty:
+                if not block:
+                    return None
+                self.check_workers()
+    
+    async def drain(self, ingest, wait_for: int = 0) -> List[Tuple[int, int]]:
+        """
+        Feed finished shard results to ingest (one call per line), waiting until at most
+        wait_for batches are in flight. Returns (end_position, line_count) for each batch
+        completed in order.
+        """
+        completed = []
+        while self.inflight:
+            block = len(self.inflight) > wait_for
+            result = await asyncio.to_thread(self.receive, True) if block else self.receive(False)
+            if result is None:
+                break
             
-            for field in high_coherence_fields:
-                if field.emergence_patterns:
-                    emergence_patterns.append({
-                        'field_id': field.field_id,
-                        'field_type': field.field_type.value,
-                        'coherence': field.coherence_score,
-                        'patterns': field.emergence_patterns,
-                        'packet_count': len(field.packets)
-                    })
-                    self.ocean_metrics['emergence_events'] += 1
+            _, sequence, per_line = result
+            for packets in per_line:
+                ingest(packets)
+            self.inflight[sequence][0] -= 1
+            
+            while self.inflight:
+                sequence, (shards_left, end_position, line_count) = next(iter(self.inflight.items()))
+                if shards_left:
+                    break
+                self.inflight.popitem(last=False)
+                completed.append((end_position, line_count))
+        return completed
+    
+    def stop(self):
+        """Ask the workers to finish and reap them"""
+        for line_queue in self.line_queues:
+            try:
+                line_queue.put(None, timeout=1.0)
+            except queue.Full:
+                pass
+        for worker in self.workers:
+            worker.join(timeout=5.0)
+            if worker.is_alive():
+                worker.terminate()
+        self.workers.clear()
+        self.line_queues.clear()
+        self.inflight.clear()
+
+# ================== Ingestion Pipeline ==================
+
+@dataclass
+class PipelineBatch:
+    """A micro-batch moving through the staged pipeline; payload changes per stage"""
+    payload: List[Any]
+    end_position: int
+    line_count: int
+    follower: Optional['LogFollower'] = None
+
+class StageQueue:
+    """
+    Bounded queue between two pipeline stages. When full, 'block' makes the producer
+    wait, 'drop_oldest' discards the oldest queued batch, and 'sample' admits one in
+    every sample_every arriving batches (replacing the oldest) and discards the rest.
+    Tracks depth, drops and the time batches wait in the queue.
+    """
+    
+    OVERFLOW_POLICIES = ('block', 'drop_oldest', 'sample')
+    
+    def __init__(self, name: str, maxsize: int = 16, policy: str = 'block', sample_every: int = 4):
+        if policy not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.name = name
+        self.policy = policy
+        self.sample_every = sample_every
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.overflow_arrivals = 0
+        self.dropped_batches = 0
+        self.dropped_lines = 0
+        self.lag_ewma = 0.0
+        self.max_lag = 0.0  # Since metrics() last reset it
+    
+    def __len__(self) -> int:
+        return self.queue.qsize()
+    
+    def drop_oldest(self):
+        _, dropped = self.queue.get_nowait()
+        self.queue.task_done()
+        self.discard(dropped)
+    
+    def discard(self, batch: PipelineBatch):
+        self.dropped_batches += 1
+        self.dropped_lines += batch.line_count
+    
+    async def put(self, batch: PipelineBatch):
+        if self.queue.full() and self.policy != 'block':
+            self.overflow_arrivals += 1
+            if self.policy == 'sample' and self.overflow_arrivals % self.sample_every:
+                self.discard(batch)
+                return
+            self.drop_oldest()
+        await self.queue.put((time.monotonic(), batch))
+    
+    async def get(self) -> PipelineBatch:
+        enqueued_at, batch = await self.queue.get()
+        lag = time.monotonic() - enqueued_at
+        self.lag_ewma += 0.1 * (lag - self.lag_ewma)
+        self.max_lag = max(self.max_lag, lag)
+        return batch
+    
+    def task_done(self):
+        self.queue.task_done()
+    
+    async def join(self):
+        await self.queue.join()
+    
+    def metrics(self, reset_peaks: bool = True) -> Dict[str, Any]:
+        report = {
+            'depth': self.queue.qsize(),
+            'capacity': self.queue.maxsize,
+            'policy': self.policy,
+            'dropped_batches': self.dropped_batches,
+            'dropped_lines': self.dropped_lines,
+            'lag_ms': self.lag_ewma * 1000,
+            'max_lag_ms': self.max_lag * 1000
+        }
+        if reset_peaks:
+            self.max_lag = 0.0
+        return report
+
+# ================== Metrics Streaming ==================
+
+def metric_delta(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Nested dict of the values in current that differ from previous (removed keys map to None)"""
+    delta = {}
+    for key, value in current.items():
+        old = previous.get(key)
+        if isinstance(value, dict) and isinstance(old, dict):
+            changes = metric_delta(old, value)
+            if changes:
+                delta[key] = changes
+        elif value != old or key not in previous:
+            delta[key] = value
+    for key in previous:
+        if key not in current:
+            delta[key] = None
+    return delta
+
+class MetricsStream:
+    """
+    Small local HTTP server for the dashboard. GET /events is a server-sent-events
+    stream that opens with a 'snapshot' of the full report and then sends 'delta'
+    events holding only the values that changed; GET /metrics returns the current
+    report as JSON. Slow subscribers are resynced with a fresh snapshot rather than
+    buffering without limit.
+    """
+    
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765, keepalive: float = 15.0,
+                 subscriber_queue: int = 64):
+        self.host = host
+        self.port = port
+        self.keepalive = keepalive
+        self.subscriber_queue = subscriber_queue
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.report: Dict[str, Any] = {}
+        self.sequence = 0
+        self.server: Optional[asyncio.AbstractServer] = None
+    
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]  # Resolves port 0
+        logger.info(f"Metrics stream listening on http://{self.host}:{self.port}/events")
+    
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+    
+    def event(self, name: str, payload: Dict[str, Any]) -> bytes:
+        data = json.dumps(payload, separators=(',', ':'), default=float)
+        return f"id: {self.sequence}\nevent: {name}\ndata: {data}\n\n".encode()
+    
+    def publish(self, report: Dict[str, Any]) -> bool:
+        """Push what changed since the last report; returns False when nothing did"""
+        delta = metric_delta(self.report, report)
+        delta.pop('timestamp', None)
+        if not delta:
+            return False
         
-        return emergence_patterns
+        delta['timestamp'] = report.get('timestamp')
+        self.report = report
+        self.sequence += 1
+        message = self.event('delta', delta)
+        for subscriber in self.subscribers:
+            if subscriber.full():
+                # Too far behind for deltas to be useful; start it over from a snapshot
+                while not subscriber.empty():
+                    subscriber.get_nowait()
+                subscriber.put_nowait(self.event('snapshot', self.report))
+            else:
+                subscriber.put_nowait(message)
+        return True
     
-    def calculate_ocean_metrics(self) -> Dict[str, Any]:
-        """Calculate overall ocean health and intelligence metrics"""
-        with self.lock:
-            total_coherence = sum(f.coherence_score for f in self.fields.values())
-            avg_coherence = total_coherence / len(self.fields) if self.fields else 0
-            
-            # Calculate graph connectivity
-            total_connections = sum(len(connections) for connections in self.packet_graph.values())
-            avg_connections = total_connections / len(self.packet_graph) if self.packet_graph else 0
-            
-            self.ocean_metrics.update({
-                'average_coherence': avg_coherence,
-                'average_connections': avg_connections,
-                'field_count': len(self.fields),
-                'packet_count': len(self.all_packets),
-                'graph_density': total_connections / (len(self.all_packets) ** 2) if self.all_packets else 0
-            })
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass  # Headers are not needed
+            path = request_line[1].split('?')[0] if len(request_line) > 1 else '/'
             
-            return self.ocean_metrics.copy()
+            if path == '/events':
+                await self.stream_events(writer)
+            elif path == '/metrics':
+                body = json.dumps(self.report, separators=(',', ':'), default=float).encode()
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                             b"Access-Control-Allow-Origin: *\r\nCache-Control: no-cache\r\n"
+                             + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                             + body)
+                await writer.drain()
+            else:
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    async def stream_events(self, writer: asyncio.StreamWriter):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n"
+                     b"Access-Control-Allow-Origin: *\r\n\r\n")
+        writer.write(self.event('snapshot', self.report))
+        await writer.drain()
+        
+        subscriber: asyncio.Queue = asyncio.Queue(self.subscriber_queue)
+        self.subscribers.add(subscriber)
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscriber.get(), self.keepalive)
+                except asyncio.TimeoutError:
+                    message = b": keepalive\n\n"
+                writer.write(message)
+                await writer.drain()
+        finally:
+            self.subscribers.discard(subscriber)
 
 # ================== Sidecar Application ==================
 
+def synthetic_log_entry() -> Dict[str, Any]:
+    """One synthetic log entry in the format the agents understand"""
+    return {
+        'timestamp': time.time(),
+        'cpu_temp': 45 + random.gauss(0, 5),
+        'memory': {
+            'used_percent': 60 + random.gauss(0, 10)
+        },
+        'response_time': 150 + random.gauss(0, 30),
+        'access_type': random.choice(['read', 'write', 'execute']),
+        'user': random.choice(['system', 'user', 'daemon'])
+    }
+
 class MacAgentSidecar:
     """
     The main sidecar application that trails logs and orchestrates the intelligence ocean.
     """
     
-    def __init__(self, log_file: str = "/var/log/macagent.log"):
+    def __init__(self, log_file: str = "/var/log/macagent.log", compact_packets: bool = False,
+                 batch_lines: int = 256, batch_ms: float = 50.0,
+                 read_chunk_bytes: int = 1 << 20,
+                 checkpoint_file: Optional[str] = 'sidecar-log-offset.json',
+                 json_backend: Optional[str] = None, typed_entries: bool = True,
+                 route_entries: bool = True, shards: int = 0, shard_key: str = 'user',
+                 queue_size: int = 0, overflow_policy: str = 'block',
+                 metrics_port: Optional[int] = None, metrics_interval: float = 0.25,
+                 journal_dir: Optional[str] = None, windowing: Optional[FieldWindowing] = None):
         self.log_file = Path(log_file)
         self.agents: List[IntelligenceAgent] = []
-        self.ocean = IntelligenceOcean()
+        self.ocean = IntelligenceOcean(compact_packets=compact_packets, windowing=windowing)
         self.running = False
         self.log_position = 0
+        self.follow = True  # False stops trailing at EOF instead of waiting for more data
+        self.load_generator: Optional[SyntheticLoadGenerator] = None  # Demo mode's synthetic log writer
+        
+        # Micro-batching: flush after batch_lines lines or batch_ms milliseconds (0 lines = per-line mode)
+        self.batch_lines = batch_lines
+        self.batch_ms = batch_ms
+        self.read_chunk_bytes = read_chunk_bytes
+        
+        # Offset checkpoint used by the batched follower to resume after a restart (None disables)
+        self.checkpoint_file = Path(checkpoint_file) if checkpoint_file else None
+        
+        # Log lines reach agents as typed LogRecords unless typed_entries is False
+        self.decoder = LogDecoder(typed=typed_entries, backend=json_backend)
+        
+        # Send entries only to agents subscribed to their keys (False broadcasts to all)
+        self.route_entries = route_entries
+        
+        # Run agents in worker processes partitioned by shard_key (0 keeps them in-process)
+        if shards and batch_lines <= 0:
+            raise ValueError("Sharded ingestion requires batched mode (batch_lines > 0)")
+        self.shard_pool = (ShardPool(shards, shard_key, json_backend=json_backend,
+                                     typed_entries=typed_entries, route_entries=route_entries)
+                           if shards else None)
+        
+        # Staged pipeline: read -> decode -> agents -> ocean over bounded queues (0 = inline).
+        # The overflow policy applies at the entrance; inner queues block, so work that
+        # was already decoded or analysed is never discarded.
+        if queue_size and (shards or batch_lines <= 0):
+            raise ValueError("The staged pipeline needs batched, in-process ingestion")
+        self.stages: Dict[str, StageQueue] = {}
+        if queue_size:
+            self.stages = {
+                'decode': StageQueue('decode', queue_size, overflow_policy),
+                'agents': StageQueue('agents', queue_size),
+                'ocean': StageQueue('ocean', queue_size),
+            }
+        self.stage_tasks: List[asyncio.Task] = []  # Running stage loops, watched by flush and drain
+        
+        # Server-sent-events metrics for the dashboard (None disables the server)
+        self.metrics_stream = MetricsStream(port=metrics_port) if metrics_port is not None else None
+        self.metrics_interval = metrics_interval
+        
+        # Packet journal replayed at startup (None keeps the ocean in memory only)
+        self.journal = PacketJournal(journal_dir) if journal_dir else None
         self.stats = {
             'lines_processed': 0,
             'packets_generated': 0,
             'waves_created': 0,
-            'emergence_events': 0
+            'emergence_events': 0,
+            'lines_dropped': 0,
+            'stage_errors': 0
         }
         
         # Initialize agent swarm
@@ -530,18 +3570,8 @@ class MacAgentSidecar:
         
     def initialize_agents(self):
         """Initialize the swarm of intelligence agents"""
-        self.agents = [
-            HardwareMonitorAgent(),
-            PerformanceAnalysisAgent(),
-            SecurityAuditAgent(),
-            PredictiveModelAgent(),
-        ]
-        
-        # Add more specialized agents
-        for i in range(3):  # Add 3 generic correlation agents
-            agent = IntelligenceAgent(f"correlator_{i}", IntelligenceFieldType.CORRELATION)
-            self.agents.append(agent)
-        
+        self.agents = create_agent_swarm()
+        self.router = AgentRouter(self.agents, enabled=self.route_entries)
         logger.info(f"Initialized {len(self.agents)} intelligence agents")
     
     async def trail_log(self):
@@ -550,6 +3580,10 @@ class MacAgentSidecar:
             # Create mock log for demonstration
             self.log_file.write_text("")
         
+        if self.batch_lines > 0:
+            await self.trail_log_batched()
+            return
+        
         async with aiofiles.open(self.log_file, 'r') as f:
             # Seek to last position
             await f.seek(self.log_position)
@@ -560,44 +3594,218 @@ class MacAgentSidecar:
                     self.log_position = await f.tell()
                     await self.process_log_line(line)
                     self.stats['lines_processed'] += 1
+                elif not self.follow:
+                    break
                 else:
-                    # No new data, create synthetic log for demo
-                    await self.generate_synthetic_log()
+                    # No new data yet; only the demo load generator writes synthetic lines
                     await asyncio.sleep(0.1)
     
-    async def generate_synthetic_log(self):
-        """Generate synthetic log entries for demonstration"""
-        log_entry = {
-            'timestamp': time.time(),
-            'cpu_temp': 45 + random.gauss(0, 5),
-            'memory': {
-                'used_percent': 60 + random.gauss(0, 10)
-            },
-            'response_time': 150 + random.gauss(0, 30),
-            'access_type': random.choice(['read', 'write', 'execute']),
-            'user': random.choice(['system', 'user', 'daemon'])
-        }
+    async def trail_log_batched(self):
+        """
+        Trail the log in large chunks, splitting lines in memory and pushing
+        micro-batches of up to batch_lines lines (or batch_ms old) through the agents.
+        The LogFollower handles rotation, truncation and the offset checkpoint.
+        """
+        follower = LogFollower(self.log_file, self.checkpoint_file)
+        await follower.open(self.log_position)
+        if self.shard_pool is not None:
+            self.shard_pool.start()
+        self.stage_tasks = [asyncio.create_task(stage(), name=stage.__name__) for stage in
+                            (self.decode_stage, self.agent_stage, self.ocean_stage)] if self.stages else []
+        
+        pending = b''
+        batch: List[str] = []
+        batch_started = 0.0
+        batch_end = follower.position
+        
+        try:
+            while self.running:
+                chunk = await follower.read(self.read_chunk_bytes)
+                if not chunk:
+                    change = follower.detect_change()
+                    if change == 'rotated' and pending:
+                        # The old file is complete, so its unterminated tail is a line
+                        batch.append(pending.decode('utf-8', errors='replace'))
+                        batch_end += len(pending)
+                    elif not self.follow and pending:
+                        # Final unterminated line, as readline would return it
+                        batch.append(pending.decode('utf-8', errors='replace'))
+                        batch_end += len(pending)
+                        pending = b''
+                    if batch:
+                        await self.flush_batch(batch, batch_end, follower)
+                        batch = []
+                    
+                    if change is not None:
+                        # Offsets in flight belong to the old file, so settle them first
+                        await self.drain_pipeline()
+                        if change == 'rotated':
+                            logger.info(f"Log rotated, reopening {self.log_file}")
+                            await follower.reopen()
+                        else:
+                            logger.info(f"Log truncated, rewinding {self.log_file}")
+                            await follower.rewind()
+                        pending = b''
+                        batch_end = 0
+                        follower.commit(0)
+                        continue
+                    
+                    if not self.follow:
+                        break
+                    # No new data yet; only the demo load generator writes synthetic lines
+                    await asyncio.sleep(0.1)
+                    continue
+                
+                lines = (pending + chunk).split(b'\n')
+                pending = lines.pop()
+                for raw in lines:
+                    if not batch:
+                        batch_started = time.monotonic()
+                    batch.append(raw.decode('utf-8', errors='replace'))
+                    batch_end += len(raw) + 1
+                    
+                    if (len(batch) >= self.batch_lines
+                            or (time.monotonic() - batch_started) * 1000 >= self.batch_ms):
+                        await self.flush_batch(batch, batch_end, follower)
+                        batch = []
+            
+            if self.shard_pool is not None:
+                await self.drain_shards(follower, wait_for=0)
+            await self.drain_pipeline()
+        finally:
+            if self.shard_pool is not None:
+                self.shard_pool.stop()
+            for task in self.stage_tasks:
+                task.cancel()
+            await asyncio.gather(*self.stage_tasks, return_exceptions=True)
+            self.stage_tasks = []
+            await follower.close()
+    
+    async def flush_batch(self, lines: List[str], end_position: int,
+                          follower: Optional['LogFollower'] = None):
+        """Process a micro-batch and advance the log offset past it"""
+        if self.shard_pool is not None:
+            await self.shard_pool.submit(lines, end_position)
+            await self.drain_shards(follower, wait_for=self.shard_pool.max_inflight)
+            return
+        if self.stages:
+            await self.watch_stages(self.stages['decode'].put(
+                PipelineBatch(lines, end_position, len(lines), follower)))
+            self.stats['lines_dropped'] = self.stages['decode'].dropped_lines
+            return
         
-        # Write to log file
-        async with aiofiles.open(self.log_file, 'a') as f:
-            await f.write(json.dumps(log_entry) + '\n')
+        await self.process_log_batch(lines)
+        self.log_position = end_position
+        self.stats['lines_processed'] += len(lines)
+        if follower is not None:
+            follower.commit(end_position)
+    
+    async def decode_stage(self):
+        """Pipeline stage: raw lines to log entries"""
+        while True:
+            batch = await self.stages['decode'].get()
+            try:
+                batch.payload = [self.decode_log_line(line) for line in batch.payload]
+                await self.stages['agents'].put(batch)
+            except Exception as e:
+                self.stage_failed('decode', batch, e)
+            finally:
+                self.stages['decode'].task_done()
+            await asyncio.sleep(0)  # Let timers such as the metrics reporter run between batches
+    
+    async def agent_stage(self):
+        """Pipeline stage: log entries to per-line packets"""
+        while True:
+            batch = await self.stages['agents'].get()
+            try:
+                batch.payload = await run_agent_batch(self.agents, self.router, batch.payload)
+                await self.stages['ocean'].put(batch)
+            except Exception as e:
+                self.stage_failed('agents', batch, e)
+            finally:
+                self.stages['agents'].task_done()
+            await asyncio.sleep(0)
+    
+    async def ocean_stage(self):
+        """Pipeline stage: packets into the ocean, then advance the log offset"""
+        while True:
+            batch = await self.stages['ocean'].get()
+            try:
+                for packets in batch.payload:
+                    self.ingest_packets(packets)
+                self.log_position = batch.end_position
+                self.stats['lines_processed'] += batch.line_count
+                if batch.follower is not None:
+                    batch.follower.commit(batch.end_position)
+            except Exception as e:
+                self.stage_failed('ocean', batch, e)
+            finally:
+                self.stages['ocean'].task_done()
+            await asyncio.sleep(0)
+    
+    def stage_failed(self, name: str, batch: PipelineBatch, error: Exception):
+        """A batch failed inside a stage: log it and keep the stage running for later batches"""
+        self.stats['stage_errors'] += 1
+        logger.error(f"Pipeline {name} stage failed on a batch of {batch.line_count} lines: {error!r}")
+    
+    async def watch_stages(self, awaitable):
+        """
+        Await a queue operation while watching the stage tasks, so a stage that died
+        raises here instead of leaving a blocked put or join waiting forever
+        """
+        waiter = asyncio.ensure_future(awaitable)
+        done, _ = await asyncio.wait([waiter, *self.stage_tasks], return_when=asyncio.FIRST_COMPLETED)
+        if waiter not in done:
+            waiter.cancel()
+            for task in done:
+                error = None if task.cancelled() else task.exception()
+                raise RuntimeError(f"Pipeline stage {task.get_name()} stopped") from error
+        return waiter.result()
+    
+    async def drain_pipeline(self):
+        """Wait until every queued batch has reached the ocean"""
+        for stage in self.stages.values():
+            await self.watch_stages(stage.join())
+        if self.stages:
+            self.stats['lines_dropped'] = self.stages['decode'].dropped_lines
+    
+    async def drain_shards(self, follower: Optional['LogFollower'], wait_for: int):
+        """Ingest shard results and advance the offset past batches every shard finished"""
+        for end_position, line_count in await self.shard_pool.drain(self.ingest_packets, wait_for):
+            self.log_position = end_position
+            self.stats['lines_processed'] += line_count
+            if follower is not None:
+                follower.commit(end_position)
+    
+    def decode_log_line(self, line: str) -> Any:
+        """Parse a log line into a log entry (a LogRecord, or a dict when untyped)"""
+        return self.decoder.decode(line)
     
     async def process_log_line(self, line: str):
         """Process a single log line through all agents"""
-        try:
-            log_entry = json.loads(line) if line.startswith('{') else {'raw': line}
-        except json.JSONDecodeError:
-            log_entry = {'raw': line}
+        log_entry = self.decode_log_line(line)
+        agents = self.router.route(log_entry)
+        if not agents:
+            return
         
-        # Process through all agents in parallel
+        # Process through subscribed agents in parallel
         tasks = []
-        for agent in self.agents:
+        for agent in agents:
             tasks.append(agent.process_log_entry(log_entry))
         
         packets = await asyncio.gather(*tasks)
+        self.ingest_packets([p for p in packets if p is not None])
+    
+    async def process_log_batch(self, lines: List[str]):
+        """Process a micro-batch of lines with one process_batch call per agent"""
+        log_entries = [self.decode_log_line(line) for line in lines]
         
-        # Add valid packets to ocean
-        valid_packets = [p for p in packets if p is not None]
+        # Packets come back grouped per line so waves form exactly as in per-line mode
+        for packets in await run_agent_batch(self.agents, self.router, log_entries):
+            self.ingest_packets(packets)
+    
+    def ingest_packets(self, valid_packets: List[IntelligencePacket]):
+        """Add one line's packets to the ocean and create a wave when enough arrived"""
         for packet in valid_packets:
             self.ocean.add_packet(packet)
             self.stats['packets_generated'] += 1
@@ -619,8 +3827,7 @@ class MacAgentSidecar:
             await asyncio.sleep(5)  # Run every 5 seconds
             
             # Get recent packets for correlation
-            with self.ocean.lock:
-                recent_packets = list(self.ocean.all_packets.values())[-50:]
+            recent_packets = self.ocean.recent_packets(50)
             
             if len(recent_packets) > 10:
                 # Group by field type for agent correlation
@@ -644,36 +3851,83 @@ class MacAgentSidecar:
                         if correlation:
                             self.ocean.add_packet(correlation)
     
+    def build_metrics_report(self, reset_peaks: bool = True) -> Dict[str, Any]:
+        """Current sidecar, ocean and pipeline metrics"""
+        report = {
+            'sidecar_stats': dict(self.stats),
+            'ocean_metrics': self.ocean.calculate_ocean_metrics(),
+            'timestamp': datetime.now().isoformat()
+        }
+        if self.stages:
+            report['pipeline'] = {name: stage.metrics(reset_peaks) for name, stage in self.stages.items()}
+        # Agents run in-process unless sharded, where each worker keeps its own sketches
+        top_accessors = [entry for agent in self.agents if isinstance(agent, SecurityAuditAgent)
+                         for entry in agent.top_accessor_report()]
+        if top_accessors:
+            report['top_accessors'] = top_accessors
+        # ocean_metrics['expired_fields'] counts every finalized window; these are the latest
+        finalized = self.ocean.recent_windows()
+        if finalized:
+            report['finalized_windows'] = finalized
+        return report
+    
     async def metrics_reporter(self):
         """Periodically report metrics"""
         while self.running:
             await asyncio.sleep(10)  # Report every 10 seconds
             
-            ocean_metrics = self.ocean.calculate_ocean_metrics()
-            
-            report = {
-                'sidecar_stats': self.stats,
-                'ocean_metrics': ocean_metrics,
-                'timestamp': datetime.now().isoformat()
-            }
+            report = self.build_metrics_report()
+            report['graph'] = await asyncio.to_thread(self.ocean.graph_report)
             
             logger.info(f"Intelligence Ocean Report: {json.dumps(report, indent=2)}")
             
-            # Write to metrics file
-            async with aiofiles.open('ocean-metrics.json', 'w') as f:
-                await f.write(json.dumps(report, indent=2))
+            # Write to metrics file; the rename means readers never see it half-written
+            await asyncio.to_thread(write_file_atomic, Path('ocean-metrics.json'),
+                                    json.dumps(report), False)
+    
+    async def journal_maintenance(self, interval: float = 1.0):
+        """Flush the journal every interval and snapshot the ocean when enough records accrued"""
+        while self.running:
+            await asyncio.sleep(interval)
+            self.journal.flush()
+            if self.journal.unsealed:
+                await asyncio.to_thread(self.journal.seal)
+            if self.journal.snapshot_due():
+                segment, packets, counters = self.ocean.checkpoint_journal()
+                await asyncio.to_thread(self.journal.write_snapshot, segment, packets, counters)
+    
+    async def metrics_publisher(self):
+        """Push metric deltas to dashboard subscribers every metrics_interval seconds"""
+        await self.metrics_stream.start()
+        try:
+            while self.running:
+                self.metrics_stream.publish(self.build_metrics_report(reset_peaks=False))
+                await asyncio.sleep(self.metrics_interval)
+        finally:
+            await self.metrics_stream.close()
     
     async def run(self):
         """Main run loop for the sidecar"""
         self.running = True
         logger.info("MacAgent Sidecar starting - Intelligence Ocean initializing...")
         
+        if self.journal is not None:
+            start = time.perf_counter()
+            restored = await asyncio.to_thread(self.ocean.restore_journal, self.journal)
+            logger.info(f"Replayed {restored} journaled packets in {time.perf_counter() - start:.2f}s")
+        
         # Start all async tasks
         tasks = [
             self.trail_log(),
             self.correlation_cycle(),
             self.metrics_reporter()
         ]
+        if self.load_generator is not None:
+            tasks.append(self.load_generator.run())
+        if self.metrics_stream is not None:
+            tasks.append(self.metrics_publisher())
+        if self.journal is not None:
+            tasks.append(self.journal_maintenance())
         
         try:
             await asyncio.gather(*tasks)
@@ -684,8 +3938,887 @@ class MacAgentSidecar:
             logger.error(f"Error in sidecar: {e}")
             self.running = False
         finally:
-            self.ocean.executor.shutdown(wait=True)
-            self.ocean.process_executor.shutdown(wait=True)
+            if self.load_generator is not None:
+                self.load_generator.running = False
+            if self.journal is not None:
+                with self.ocean.lock:
+                    self.journal.close()
+                    self.ocean.journal = None
+            self.ocean.shutdown()
+
+# ================== Self Checks ==================
+
+def check_incremental_coherence(packet_count: int = 500, tolerance: float = 1e-3,
+                                seed: int = 7) -> Dict[str, Any]:
+    """Compare incremental field coherence against the exact pairwise score"""
+    rng = random.Random(seed)
+    kernel = ExponentialDecayKernel(tolerance=tolerance)
+    incremental = IntelligenceField("check_incremental", IntelligenceFieldType.HARDWARE, 0.0,
+                                    coherence_tracker=IncrementalCoherence(kernel))
+    exact = IntelligenceField("check_exact", IntelligenceFieldType.HARDWARE, 0.0)
+
+    # Mostly ordered timestamps inside one bucket, with some late arrivals
+    timestamp = 0.0
+    worst_error = 0.0
+    for i in range(packet_count):
+        timestamp = min(timestamp + rng.expovariate(packet_count / FIELD_BUCKET_SECONDS),
+                        FIELD_BUCKET_SECONDS - 1)
+        late = rng.random() < 0.05
+        packet = IntelligencePacket(
+            id=f"check_{i}",
+            timestamp=max(0.0, timestamp - rng.uniform(0, 30)) if late else timestamp,
+            source_agent="self_check",
+            field_type=IntelligenceFieldType.HARDWARE,
+            confidence=rng.random(),
+            data={}
+        )
+        incremental.add_packet(packet)
+        exact.add_packet(packet)
+        worst_error = max(worst_error, abs(incremental.coherence_score - exact.coherence_score))
+
+    return {
+        'packets': packet_count,
+        'kernel_terms': kernel.terms,
+        'kernel_max_error': kernel.max_error,
+        'worst_coherence_error': worst_error,
+        'out_of_order_packets': incremental.coherence_tracker.out_of_order,
+        'passed': worst_error <= tolerance
+    }
+
+def check_wave_engines(packet_count: int = 60, seed: int = 7) -> Dict[str, Any]:
+    """Check that the vectorized and pool wave engines find the same pairs"""
+    packets = synthetic_wave_packets(packet_count, seed)
+    ocean = IntelligenceOcean(max_workers=4)
+    try:
+        pool_pairs = [(p1.id, p2.id) for p1, p2 in ocean.find_wave_pairs_pool(packets)]
+        vectorized_pairs = [(p1.id, p2.id) for p1, p2 in ocean.find_wave_pairs_vectorized(packets)]
+    finally:
+        ocean.shutdown()
+    
+    return {
+        'packets': packet_count,
+        'pairs': len(pool_pairs),
+        'passed': pool_pairs == vectorized_pairs
+    }
+
+def check_rolling_stats(sample_count: int = 5000, window: int = 250, seed: int = 7) -> Dict[str, Any]:
+    """Compare RollingStats against np.mean/np.std over the same sliding window"""
+    rng = random.Random(seed)
+    stats = RollingStats(window)
+    history = deque(maxlen=window)
+    worst_error = 0.0
+    for _ in range(sample_count):
+        value = 1e4 + rng.gauss(0, 5)  # Large offset exercises cancellation
+        stats.push(value)
+        history.append(value)
+        worst_error = max(worst_error,
+                          abs(stats.mean - float(np.mean(history))),
+                          abs(stats.std - float(np.std(history))))
+    
+    return {
+        'samples': sample_count,
+        'window': window,
+        'worst_error': worst_error,
+        'passed': worst_error < 1e-6
+    }
+
+def check_quantile_sketch(sample_count: int = 20000, window: int = 5000,
+                          relative_accuracy: float = 0.01, seed: int = 7) -> Dict[str, Any]:
+    """Compare sliding-window sketch quantiles against np.percentile"""
+    rng = random.Random(seed)
+    sketch = QuantileSketch(relative_accuracy=relative_accuracy, window=window)
+    history = deque(maxlen=window)
+    worst_error = 0.0
+    for i in range(sample_count):
+        value = rng.lognormvariate(5, 0.5)  # Response-time-like, ~150ms median
+        sketch.push(value)
+        history.append(value)
+        if i % 500 == 499:
+            ordered = sorted(history)
+            for q in (0.5, 0.95, 0.99):
+                # Compare with the true sample at the sketch's rank convention
+                exact = ordered[math.floor(q * (len(ordered) - 1))]
+                worst_error = max(worst_error, abs(sketch.quantile(q) - exact) / exact)
+    
+    return {
+        'samples': sample_count,
+        'window': window,
+        'worst_relative_error': worst_error,
+        'passed': worst_error <= relative_accuracy + 1e-9
+    }
+
+def check_trend_estimator(sample_count: int = 3000, window: int = 20, seed: int = 7) -> Dict[str, Any]:
+    """Compare the sliding-window trend slope against np.polyfit"""
+    rng = random.Random(seed)
+    trend = TrendEstimator(window=window)
+    history = deque(maxlen=window)
+    worst_error = 0.0
+    for i in range(sample_count):
+        value = 45 + 0.01 * i + rng.gauss(0, 5)
+        trend.push(i, value)
+        history.append(value)
+        if len(history) > 2:
+            exact = float(np.polyfit(range(len(history)), list(history), 1)[0])
+            worst_error = max(worst_error, abs(trend.slope - exact))
+    
+    return {
+        'samples': sample_count,
+        'window': window,
+        'worst_slope_error': worst_error,
+        'passed': worst_error < 1e-8
+    }
+
+def check_bulk_coherence(packet_count: int = 4000, seed: int = 7) -> Dict[str, Any]:
+    """Compare IncrementalCoherence.extend against packet-by-packet add, late packets included"""
+    rng = random.Random(seed)
+    kernel = ExponentialDecayKernel()
+    packets = []
+    now = time.time()
+    for i in range(packet_count):
+        jitter = -rng.uniform(0, 30) if rng.random() < 0.05 else rng.uniform(0, 0.2)
+        packets.append(IntelligencePacket(
+            id=f"bulk_{i}",
+            timestamp=now + i * 0.07 + jitter,
+            source_agent="self_check",
+            field_type=IntelligenceFieldType.HARDWARE,
+            confidence=rng.random(),
+            data={}
+        ))
+    
+    single = IncrementalCoherence(kernel)
+    for i, packet in enumerate(packets):
+        single.add(packet.timestamp, packet.confidence, packets[:i])
+    bulk = IncrementalCoherence(kernel)
+    bulk.extend(packets[:packet_count // 3])
+    bulk.extend(packets, packet_count // 3)
+    
+    error = abs(single.score - bulk.score)
+    return {
+        'packets': packet_count,
+        'late_packets': single.out_of_order,
+        'score': single.score,
+        'bulk_score': bulk.score,
+        'error': error,
+        'passed': error < 1e-9 and single.comparisons == bulk.comparisons
+    }
+
+def check_ocean_aggregates(packet_count: int = 5000, seed: int = 7) -> Dict[str, Any]:
+    """Compare the running metric aggregates against a full rescan after eviction churn"""
+    rng = random.Random(seed)
+    ocean = IntelligenceOcean(retention=RetentionPolicy(max_field_age=600, max_packets=800,
+                                                        max_graph_nodes=500))
+    packets = synthetic_wave_packets(packet_count, seed=seed)
+    for i, packet in enumerate(packets):
+        packet.timestamp += i * 0.5  # Spans several field buckets, so fields expire too
+        packet.parent_packets = [packets[rng.randrange(i)].id for _ in range(2)] if i else []
+        ocean.add_packet(packet)
+    
+    metrics = ocean.calculate_ocean_metrics()
+    ocean.shutdown()
+    degree_total = int(ocean.graph_snapshot().degrees().sum())
+    coherence_total = sum(f.coherence_score for f in ocean.fields.values())
+    
+    return {
+        'packets': packet_count,
+        'fields': len(ocean.fields),
+        'degree_total': degree_total,
+        'tracked_degree_total': ocean.packet_graph.degree_total,
+        'coherence_error': abs(coherence_total - ocean.coherence_total),
+        'passed': (degree_total == ocean.packet_graph.degree_total
+                   and abs(coherence_total - ocean.coherence_total) < 1e-9
+                   and metrics['field_count'] == len(ocean.fields)
+                   and metrics['graph_nodes'] == len(ocean.packet_graph))
+    }
+
+def check_graph_analytics(packet_count: int = 3000, seed: int = 7) -> Dict[str, Any]:
+    """Compare CSR components, lineage and degrees against dict-of-set traversals under churn"""
+    rng = random.Random(seed)
+    graph = PacketGraph(merge_threshold=97)  # Small, so merges interleave with removals
+    parents: Dict[str, Set[str]] = defaultdict(set)
+    children: Dict[str, Set[str]] = defaultdict(set)
+    for i in range(packet_count):
+        packet_id = f"packet_{i}"
+        if i and rng.random() < 0.7:
+            # Parents may already be evicted, which re-creates them as fresh nodes
+            parent_ids = [f"packet_{rng.randrange(max(0, i - 200), i)}" for _ in range(rng.randint(1, 2))]
+            graph.add_packet(packet_id, parent_ids)
+            for parent_id in parent_ids:
+                children[parent_id].add(packet_id)
+                parents[packet_id].add(parent_id)
+                children.setdefault(packet_id, set())
+        live = list(parents.keys() | children.keys())
+        if live and rng.random() < 0.25:
+            victim = rng.choice(live)
+            graph.remove_node(victim)
+            for neighbor in parents.pop(victim, set()) | children.pop(victim, set()):
+                parents.get(neighbor, set()).discard(victim)
+                children.get(neighbor, set()).discard(victim)
+    
+    def walk(start: str, edges: Dict[str, Set[str]]) -> Set[str]:
+        seen, stack = {start}, [start]
+        while stack:
+            for neighbor in edges.get(stack.pop(), ()):
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    stack.append(neighbor)
+        return seen - {start}
+    
+    nodes = parents.keys() | children.keys()
+    undirected = {node: parents.get(node, set()) | children.get(node, set()) for node in nodes}
+    component_count, unvisited = 0, set(nodes)
+    while unvisited:
+        unvisited -= walk(unvisited.pop(), undirected)
+        component_count += 1
+    
+    snapshot = graph.snapshot()
+    probes = rng.sample(sorted(nodes), min(50, len(nodes)))
+    lineage_ok = all(
+        set(snapshot.lineage(node)['ancestors']) == walk(node, parents)
+        and set(snapshot.lineage(node)['descendants']) == walk(node, children)
+        for node in probes
+    )
+    degree_total = sum(len(neighbors) for neighbors in undirected.values())
+    top = snapshot.top_central(1)
+    return {
+        'nodes': len(nodes),
+        'edges': degree_total // 2,
+        'components': component_count,
+        'csr_components': snapshot.components()['count'],
+        'merges': graph.merges,
+        'passed': (lineage_ok
+                   and len(graph) == snapshot.node_count == len(nodes)
+                   and snapshot.components()['count'] == component_count
+                   and graph.degree_total == degree_total == int(snapshot.degrees().sum())
+                   and (not top or top[0]['degree'] == max(len(n) for n in undirected.values())))
+    }
+
+def check_idempotent_insert(packet_count: int = 400, seed: int = 7) -> Dict[str, Any]:
+    """Repeated waves and re-sent packets must leave the ocean unchanged, new ids must never be dropped"""
+    ocean = IntelligenceOcean(retention=RetentionPolicy(max_field_age=None, max_packets=packet_count,
+                                                        max_graph_nodes=None))
+    packets = synthetic_wave_packets(packet_count, seed=seed)
+    for packet in packets:
+        ocean.add_packet(packet)
+    first_wave = ocean.create_wave(packets[:60])
+    state = (ocean.ocean_metrics['total_packets'], len(ocean.all_packets),
+             sum(len(f.packets) for f in ocean.fields.values()), ocean.packet_graph.degree_total)
+    repeat_wave = ocean.create_wave(packets[:60])
+    resent = sum(ocean.add_packet(packet) for packet in packets)  # Partly evicted by now
+    after = (ocean.ocean_metrics['total_packets'], len(ocean.all_packets),
+             sum(len(f.packets) for f in ocean.fields.values()), ocean.packet_graph.degree_total)
+    duplicates = ocean.ocean_metrics['duplicate_packets']
+    ocean.shutdown()
+    
+    # New ids are never rejected; exactly the newest `capacity` ids are remembered
+    seen = SeenPacketFilter(capacity=100)
+    false_rejects = sum(seen.check_and_add(f"id_{i}") for i in range(20_000))
+    remembered = sum(seen.is_duplicate(f"id_{i}") for i in range(20_000))
+    return {
+        'first_wave': len(first_wave),
+        'repeat_wave': len(repeat_wave),
+        'resent_accepted': resent,
+        'duplicates': duplicates,
+        'false_rejects': false_rejects,
+        'remembered': remembered,
+        'passed': (len(first_wave) > 0 and not repeat_wave and not resent and state == after
+                   and duplicates == len(first_wave) + packet_count and not false_rejects
+                   and remembered == 100 and seen.is_duplicate("id_19999"))
+    }
+
+def check_field_windowing(packet_count: int = 3000, seed: int = 7) -> Dict[str, Any]:
+    """Window assignment per policy, and expiry releasing every packet exactly once"""
+    rng = random.Random(seed)
+    windowing = FieldWindowing(
+        default=TumblingWindows(300),
+        per_type={IntelligenceFieldType.PERFORMANCE: SlidingWindows(300, 60),
+                  IntelligenceFieldType.SECURITY: SessionWindows(gap=20, max_duration=120)})
+    ocean = IntelligenceOcean(retention=RetentionPolicy(max_field_age=600, max_packets=None,
+                                                        max_graph_nodes=None),
+                              windowing=windowing)
+    packets = synthetic_wave_packets(packet_count, seed=seed)
+    timestamp = 0.0
+    for packet in packets:
+        timestamp += rng.expovariate(1 / 4.0)
+        packet.timestamp = timestamp
+        ocean.add_packet(packet)
+    
+    sliding = [f for f in ocean.fields.values() if f.field_type == IntelligenceFieldType.PERFORMANCE]
+    memberships = sum(len(f.packets) for f in sliding)
+    live_sliding = sum(1 for p in ocean.all_packets.values()
+                       if p.field_type == IntelligenceFieldType.PERFORMANCE)
+    sessions = [f for f in ocean.fields.values() if f.field_type == IntelligenceFieldType.SECURITY]
+    session_ok = all(
+        max(p.timestamp for p in f.packets) - min(p.timestamp for p in f.packets) <= 120
+        for f in sessions
+    )
+    
+    # A packet far in the future closes and expires every window
+    ocean.expire_fields(timestamp + 10_000)
+    released = ocean.ocean_metrics['evicted_packets']
+    ocean.shutdown()
+    return {
+        'packets': packet_count,
+        'sliding_memberships_per_packet': memberships / max(live_sliding, 1),
+        'session_fields': len(sessions),
+        'finalized_windows': ocean.ocean_metrics['expired_fields'],
+        'released_packets': released,
+        'passed': (session_ok and not ocean.fields and not ocean.all_packets
+                   and released == packet_count
+                   and all(isinstance(key, tuple) for key in ocean.field_snapshots)
+                   and ocean.recent_windows(1)[-1]['packet_count'] > 0)
+    }
+
+def check_capped_late_windows(packet_count: int = 3000, cap: int = 500,
+                              seed: int = 7) -> Dict[str, Any]:
+    """The packet cap must never release a packet a live sliding window still holds, late packets included"""
+    stranded = 0
+    for compact in (False, True):
+        rng = random.Random(seed)
+        ocean = IntelligenceOcean(compact_packets=compact,
+                                  windowing=FieldWindowing(SlidingWindows(300, 60)),
+                                  retention=RetentionPolicy(max_field_age=None, max_packets=cap,
+                                                            max_graph_nodes=None))
+        timestamp = 1000.0
+        for i, packet in enumerate(synthetic_wave_packets(packet_count, seed=seed)):
+            timestamp += rng.expovariate(1 / 2.0)
+            packet.timestamp = timestamp - (rng.uniform(0, 600) if rng.random() < 0.05 else 0)
+            ocean.add_packet(packet)
+            if i % 10 == 0:
+                stranded += sum(1 for f in ocean.fields.values() for p in f.packets
+                                if p.id not in ocean.all_packets)
+        ocean.shutdown()
+    return {
+        'packets': packet_count,
+        'cap': cap,
+        'stranded_packets': stranded,
+        'passed': not stranded
+    }
+
+def check_recent_index(packet_count: int = 2000, capacity: int = 256,
+                       seed: int = 7) -> Dict[str, Any]:
+    """packets_since must find every ringed packet past the cutoff, even behind late arrivals"""
+    rng = random.Random(seed)
+    ocean = IntelligenceOcean(recent_capacity=capacity,
+                              retention=RetentionPolicy(max_field_age=None, max_packets=None,
+                                                        max_graph_nodes=None))
+    packets = synthetic_wave_packets(packet_count, seed=seed)
+    for i, packet in enumerate(packets):
+        packet.timestamp = 1000.0 + i - (rng.uniform(50, 500) if rng.random() < 0.05 else 0)
+        ocean.add_packet(packet)
+    
+    ringed = packets[-capacity:]
+    cutoffs = [ringed[0].timestamp, 1000.0 + packet_count - capacity // 2, 1000.0 + packet_count]
+    mismatches = sum(
+        [p.id for p in ocean.packets_since(cutoff)] != [p.id for p in ringed if p.timestamp >= cutoff]
+        for cutoff in cutoffs
+    )
+    late = sum(1 for a, b in zip(ringed, ringed[1:]) if b.timestamp < a.timestamp)
+    ocean.shutdown()
+    return {
+        'packets': packet_count,
+        'late_in_ring': late,
+        'mismatches': mismatches,
+        'passed': late > 0 and not mismatches
+    }
+
+def run_self_checks() -> bool:
+    """Run the built-in consistency checks and log their results"""
+    checks = {
+        'incremental_coherence': check_incremental_coherence(),
+        'wave_engines': check_wave_engines(),
+        'rolling_stats': check_rolling_stats(),
+        'quantile_sketch': check_quantile_sketch(),
+        'trend_estimator': check_trend_estimator(),
+        'ocean_aggregates': check_ocean_aggregates(),
+        'bulk_coherence': check_bulk_coherence(),
+        'graph_analytics': check_graph_analytics(),
+        'idempotent_insert': check_idempotent_insert(),
+        'field_windowing': check_field_windowing(),
+        'recent_index': check_recent_index(),
+        'capped_late_windows': check_capped_late_windows(),
+    }
+    for name, result in checks.items():
+        logger.info(f"Self-check {name}: {json.dumps(result)}")
+    return all(result['passed'] for result in checks.values())
+
+# ================== Benchmarks ==================
+
+def synthetic_wave_packets(packet_count: int, seed: int = 7) -> List[IntelligencePacket]:
+    """Random agent packets spread over the agent field types"""
+    rng = random.Random(seed)
+    field_types = [IntelligenceFieldType.HARDWARE, IntelligenceFieldType.PERFORMANCE,
+                   IntelligenceFieldType.SECURITY, IntelligenceFieldType.PREDICTIVE]
+    now = time.time()
+    return [
+        IntelligencePacket(
+            id=f"wave_{i}",
+            timestamp=now,
+            source_agent="benchmark",
+            field_type=rng.choice(field_types),
+            confidence=rng.random(),
+            data={}
+        )
+        for i in range(packet_count)
+    ]
+
+def benchmark_wave_engines(sizes: Tuple[int, ...] = (10, 100, 1000, 10000),
+                           pool_limit: int = 1000) -> List[Dict[str, Any]]:
+    """
+    Time pair discovery for the pool and vectorized wave engines.
+    The pool engine submits n^2/2 futures, so it is skipped above `pool_limit` packets.
+    """
+    results = []
+    ocean = IntelligenceOcean()
+    try:
+        for size in sizes:
+            packets = synthetic_wave_packets(size)
+            row = {'packets': size, 'pairs_tested': size * (size - 1) // 2}
+            
+            start = time.perf_counter()
+            row['correlations'] = len(ocean.find_wave_pairs_vectorized(packets))
+            row['vectorized_seconds'] = time.perf_counter() - start
+            
+            if size <= pool_limit:
+                start = time.perf_counter()
+                ocean.find_wave_pairs_pool(packets)
+                row['pool_seconds'] = time.perf_counter() - start
+                row['speedup'] = row['pool_seconds'] / max(row['vectorized_seconds'], 1e-9)
+            
+            results.append(row)
+            logger.info(f"Wave benchmark: {json.dumps(row)}")
+    finally:
+        ocean.shutdown()
+    
+    return results
+
+def benchmark_packet_memory(packet_count: int = 200_000) -> Dict[str, Any]:
+    """Compare traced memory of dataclass packets against the compact packet store"""
+    import tracemalloc
+    
+    def build(compact: bool) -> int:
+        store = PacketStore() if compact else None
+        tracemalloc.start()
+        packets = []
+        for i in range(packet_count):
+            packet = IntelligencePacket(
+                id=f"{i:012x}",
+                timestamp=1_700_000_000.0 + i,
+                source_agent="hardware_monitor",
+                field_type=IntelligenceFieldType.HARDWARE,
+                confidence=0.9,
+                data={'anomaly_type': 'high_cpu_temp', 'current_temp': 80.0 + i % 10},
+                parent_packets=[f"{i - 1:012x}"] if i % 4 == 0 else []
+            )
+            packets.append(store.append(packet) if compact else packet)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return current
+    
+    result = {'packets': packet_count, 'dataclass_bytes': build(False), 'compact_bytes': build(True)}
+    result['bytes_saved_per_packet'] = (result['dataclass_bytes'] - result['compact_bytes']) / packet_count
+    logger.info(f"Packet memory benchmark: {json.dumps(result)}")
+    return result
+
+def write_synthetic_log_file(path: str, size_mb: float) -> int:
+    """Write synthetic log lines until the file reaches size_mb; returns the line count"""
+    target = int(size_mb * (1 << 20))
+    generator = SyntheticLoadGenerator(path, seed=7)
+    written = lines = 0
+    with open(path, 'w', buffering=1 << 20) as f:
+        while written < target:
+            now = time.time()
+            block = generator.format_batch(1000, now, now + 0.001)
+            f.write(block)
+            written += len(block)
+            lines += 1000
+    return lines
+
+async def benchmark_ingest(size_mb: float = 2048, log_path: Optional[str] = None,
+                           batch_lines: int = 512, shards: int = 0) -> List[Dict[str, Any]]:
+    """
+    Lines per second for per-line readline ingestion versus batched chunk ingestion,
+    plus sharded ingestion across `shards` worker processes when shards > 0.
+    Uses log_path when given, otherwise writes a synthetic log of size_mb megabytes.
+    """
+    import tempfile
+    
+    generated = log_path is None
+    if generated:
+        fd, log_path = tempfile.mkstemp(prefix='macagent-ingest-', suffix='.log')
+        os.close(fd)
+        logger.info(f"Writing {size_mb} MB synthetic log to {log_path}")
+        write_synthetic_log_file(log_path, size_mb)
+    
+    results = []
+    try:
+        modes = [('per_line', 0, 0), ('batched', batch_lines, 0)]
+        if shards:
+            modes.append((f'sharded_{shards}', batch_lines, shards))
+        for mode, lines_per_batch, shard_count in modes:
+            sidecar = MacAgentSidecar(log_file=log_path, batch_lines=lines_per_batch,
+                                      checkpoint_file=None, shards=shard_count)
+            sidecar.follow = False
+            sidecar.running = True
+            start = time.perf_counter()
+            try:
+                await sidecar.trail_log()
+            finally:
+                sidecar.ocean.shutdown()
+            elapsed = time.perf_counter() - start
+            
+            row = {
+                'mode': mode,
+                'lines': sidecar.stats['lines_processed'],
+                'seconds': elapsed,
+                'lines_per_second': sidecar.stats['lines_processed'] / elapsed if elapsed else 0.0
+            }
+            results.append(row)
+            logger.info(f"Ingest benchmark: {json.dumps(row)}")
+    finally:
+        if generated:
+            os.unlink(log_path)
+    
+    return results
+
+def benchmark_decode(line_count: int = 200_000) -> List[Dict[str, Any]]:
+    """Decode throughput of each available JSON backend on synthetic log lines"""
+    lines = [json.dumps(synthetic_log_entry()) for _ in range(line_count)]
+    megabytes = sum(len(line) + 1 for line in lines) / (1 << 20)
+    
+    results = []
+    for backend in JSON_BACKENDS:
+        for typed in (False, True):
+            decode = LogDecoder(typed=typed, backend=backend).decode
+            start = time.perf_counter()
+            for line in lines:
+                decode(line)
+            elapsed = time.perf_counter() - start
+            
+            row = {
+                'backend': backend,
+                'typed': typed,
+                'lines_per_second': line_count / elapsed,
+                'megabytes_per_second': megabytes / elapsed
+            }
+            results.append(row)
+            logger.info(f"Decode benchmark: {json.dumps(row)}")
+    
+    return results
+
+async def benchmark_routing(agent_copies: int = 8, line_count: int = 20_000) -> List[Dict[str, Any]]:
+    """
+    Per-line agent calls and throughput with key routing against broadcasting to every
+    agent. Each line carries one metric family (hardware, performance or access), as
+    separate emitters would write them.
+    """
+    families = (('timestamp', 'cpu_temp', 'memory'), ('timestamp', 'response_time'),
+                ('timestamp', 'access_type', 'user'))
+    lines = []
+    for i in range(line_count):
+        entry = synthetic_log_entry()
+        lines.append(json.dumps({key: entry[key] for key in families[i % len(families)]}))
+    
+    results = []
+    for route_entries in (False, True):
+        sidecar = MacAgentSidecar(checkpoint_file=None, route_entries=route_entries)
+        sidecar.agents = [type(agent)() if type(agent) is not IntelligenceAgent else
+                          IntelligenceAgent(f"{agent.agent_id}_{copy}", agent.field_type, subscribed_keys=())
+                          for copy in range(agent_copies) for agent in sidecar.agents]
+        sidecar.router = AgentRouter(sidecar.agents, enabled=route_entries)
+        
+        agent_calls = sum(len(sidecar.router.route(sidecar.decode_log_line(line))) for line in lines)
+        start = time.perf_counter()
+        for line in lines:
+            await sidecar.process_log_line(line)
+        elapsed = time.perf_counter() - start
+        sidecar.ocean.shutdown()
+        
+        row = {
+            'mode': 'routed' if route_entries else 'broadcast',
+            'agents': len(sidecar.agents),
+            'agent_calls_per_line': agent_calls / line_count,
+            'lines_per_second': line_count / elapsed
+        }
+        results.append(row)
+        logger.info(f"Routing benchmark: {json.dumps(row)}")
+    
+    return results
+
+def benchmark_contention(packet_count: int = 100_000, reader_threads: int = 2) -> List[Dict[str, Any]]:
+    """
+    add_packet throughput and latency while reader threads poll metrics and emergence
+    in a loop, with snapshot reads against readers that scan under the ocean locks.
+    """
+    packets = synthetic_wave_packets(packet_count)
+    for i, packet in enumerate(packets):
+        packet.data = {'sequence': i}
+        if i:
+            packet.parent_packets = [packets[i - 1].id]
+    
+    results = []
+    for snapshot_reads in (False, True):
+        ocean = IntelligenceOcean(snapshot_reads=snapshot_reads)
+        stop = threading.Event()
+        reads = [0] * reader_threads
+        
+        def poll(slot: int):
+            while not stop.is_set():
+                ocean.calculate_ocean_metrics()
+                ocean.detect_emergence()
+                reads[slot] += 1
+        
+        readers = [threading.Thread(target=poll, args=(slot,), daemon=True)
+                   for slot in range(reader_threads)]
+        for reader in readers:
+            reader.start()
+        
+        latencies = np.empty(packet_count)
+        start = time.perf_counter()
+        for i, packet in enumerate(packets):
+            began = time.perf_counter()
+            ocean.add_packet(packet)
+            latencies[i] = time.perf_counter() - began
+        elapsed = time.perf_counter() - start
+        
+        stop.set()
+        for reader in readers:
+            reader.join()
+        ocean.shutdown()
+        
+        row = {
+            'readers': 'snapshot' if snapshot_reads else 'locked',
+            'reader_threads': reader_threads,
+            'adds_per_second': packet_count / elapsed,
+            'p50_add_us': float(np.percentile(latencies, 50)) * 1e6,
+            'p99_add_us': float(np.percentile(latencies, 99)) * 1e6,
+            'max_add_us': float(latencies.max()) * 1e6,
+            'reads': sum(reads)
+        }
+        results.append(row)
+        logger.info(f"Contention benchmark: {json.dumps(row)}")
+    
+    return results
+
+def benchmark_journal(packet_count: int = 1_000_000, journal_dir: Optional[str] = None) -> Dict[str, Any]:
+    """Journal append rate, then replay time of a fresh ocean from the segments and from a snapshot"""
+    import shutil
+    import tempfile
+    
+    generated = journal_dir is None
+    journal_dir = journal_dir or tempfile.mkdtemp(prefix='macagent-journal-')
+    rng = random.Random(7)
+    field_types = [IntelligenceFieldType.HARDWARE, IntelligenceFieldType.PERFORMANCE,
+                   IntelligenceFieldType.SECURITY, IntelligenceFieldType.PREDICTIVE]
+    now = time.time()
+    retention = RetentionPolicy(max_field_age=None, max_packets=None, max_graph_nodes=None)
+    
+    try:
+        journal = PacketJournal(journal_dir, snapshot_records=packet_count * 2)
+        journal.open()
+        start = time.perf_counter()
+        for i in range(packet_count):
+            journal.append(IntelligencePacket(
+                id=f"packet_{i}",
+                timestamp=now + i * 0.01,
+                source_agent="benchmark",
+                field_type=rng.choice(field_types),
+                confidence=rng.random(),
+                data={'metric': 'cpu_temp', 'value': rng.gauss(50, 5)},
+                parent_packets=[f"packet_{rng.randrange(i)}"] if i and rng.random() < 0.2 else []
+            ))
+        journal.close()
+        append_seconds = time.perf_counter() - start
+        
+        row = {'packets': packet_count, 'append_per_second': packet_count / append_seconds,
+               'journal_bytes': sum(path.stat().st_size for path in Path(journal_dir).iterdir())}
+        for source in ('segments', 'snapshot'):
+            ocean = IntelligenceOcean(retention=retention)
+            start = time.perf_counter()
+            restored = ocean.restore_journal(PacketJournal(journal_dir))
+            row[f'replay_{source}_seconds'] = time.perf_counter() - start
+            row[f'replay_{source}_packets'] = restored
+            row[f'replay_{source}_fields'] = len(ocean.fields)
+            if source == 'segments':
+                segment, packets, counters = ocean.checkpoint_journal()
+                ocean.journal.write_snapshot(segment, packets, counters)
+            ocean.journal.close()
+            ocean.shutdown()
+        
+        logger.info(f"Journal benchmark: {json.dumps(row)}")
+        return row
+    finally:
+        if generated:
+            shutil.rmtree(journal_dir, ignore_errors=True)
+
+def benchmark_graph(packet_count: int = 1_000_000, parents_per_packet: int = 2,
+                    queries: int = 100) -> Dict[str, Any]:
+    """
+    Build a lineage graph of correlation-style packets (each with a few earlier
+    parents), then time a snapshot, components, top-k centrality and lineage queries.
+    """
+    rng = np.random.default_rng(7)
+    ids = [f"packet_{i}" for i in range(packet_count)]
+    # Parents are mostly recent packets, like correlations over the newest arrivals
+    offsets = np.minimum(rng.geometric(1e-3, size=(packet_count, parents_per_packet)),
+                         np.arange(packet_count)[:, None])
+    parent_rows = (np.arange(packet_count)[:, None] - offsets).tolist()
+    
+    graph = PacketGraph()
+    start = time.perf_counter()
+    for i, rows in enumerate(parent_rows):
+        if i:
+            graph.add_packet(ids[i], [ids[row] for row in rows])
+    build_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    snapshot = graph.snapshot()
+    snapshot_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    components = snapshot.components()
+    components_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    snapshot.top_central(10)
+    central_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    lineage_sizes = [len(snapshot.lineage(ids[int(i)], max_depth=8)['ancestors'])
+                     for i in rng.integers(0, packet_count, size=queries)]
+    lineage_seconds = (time.perf_counter() - start) / queries
+    
+    row = {
+        'nodes': snapshot.node_count,
+        'edges': snapshot.edge_count,
+        'edges_per_second': snapshot.edge_count / build_seconds,
+        'merges': graph.merges,
+        'snapshot_seconds': snapshot_seconds,
+        'components': components['count'],
+        'components_seconds': components_seconds,
+        'top_central_seconds': central_seconds,
+        'lineage_ms': lineage_seconds * 1e3,
+        'mean_ancestors_depth_8': float(np.mean(lineage_sizes))
+    }
+    logger.info(f"Graph benchmark: {json.dumps(row)}")
+    return row
+
+def benchmark_packet_ids(packet_count: int = 200_000) -> Dict[str, Any]:
+    """
+    Per-packet cost of the former MD5 ids and per-call insight dict against sequence
+    ids, stable pair ids and CORRELATION_TABLE, next to the cost of add_packet itself.
+    """
+    def legacy_packet_id(agent_id: str, count: int) -> str:
+        return hashlib.md5(f"{agent_id}_{count}_{time.time()}".encode()).hexdigest()[:12]
+    
+    def legacy_correlation(p1: IntelligencePacket, p2: IntelligencePacket) -> IntelligencePacket:
+        insights = {
+            ('hardware', 'performance'): "Hardware conditions affecting performance",
+            ('performance', 'security'): "Performance anomalies indicating security issues",
+            ('hardware', 'predictive'): "Hardware trends predicting future states",
+            ('security', 'behavior'): "Security events correlating with user behavior",
+            ('diagnostic', 'optimization'): "Diagnostic findings suggesting optimizations"
+        }
+        key = (p1.field_type.value, p2.field_type.value)
+        reverse_key = (p2.field_type.value, p1.field_type.value)
+        strength = p1.confidence * p2.confidence
+        return IntelligencePacket(
+            id=hashlib.md5(f"{p1.id}_{p2.id}".encode()).hexdigest()[:12],
+            timestamp=time.time(),
+            source_agent="ocean_correlator",
+            field_type=IntelligenceFieldType.CORRELATION,
+            confidence=strength,
+            data={
+                'correlation_type': f"{p1.field_type.value}_to_{p2.field_type.value}",
+                'insight': insights.get(key, insights.get(reverse_key, "Cross-domain correlation detected")),
+                'strength': strength
+            },
+            parent_packets=[p1.id, p2.id]
+        )
+    
+    def per_packet_us(run: Callable[[], Any]) -> float:
+        start = time.perf_counter()
+        run()
+        return (time.perf_counter() - start) / packet_count * 1e6
+    
+    packets = synthetic_wave_packets(packet_count)
+    pairs = list(zip(packets, packets[1:] + packets[:1]))
+    agent = HardwareMonitorAgent()
+    ocean = IntelligenceOcean(retention=RetentionPolicy(max_packets=None, max_graph_nodes=None))
+    
+    row = {
+        'packets': packet_count,
+        'md5_packet_id_us': per_packet_us(lambda: [legacy_packet_id(agent.agent_id, i)
+                                                   for i in range(packet_count)]),
+        'sequence_packet_id_us': per_packet_us(lambda: [agent.generate_packet_id()
+                                                        for _ in range(packet_count)]),
+        'md5_correlation_us': per_packet_us(lambda: [legacy_correlation(p1, p2) for p1, p2 in pairs]),
+        'table_correlation_us': per_packet_us(lambda: [ocean.build_correlation_packet(p1, p2)
+                                                       for p1, p2 in pairs]),
+        'add_packet_us': per_packet_us(lambda: [ocean.add_packet(packet) for packet in packets])
+    }
+    ocean.shutdown()
+    
+    # Share of "build + add_packet" per agent packet and per wave packet that the new path removes
+    for kind, legacy, current in (('agent', 'md5_packet_id_us', 'sequence_packet_id_us'),
+                                  ('wave', 'md5_correlation_us', 'table_correlation_us')):
+        before = row[legacy] + row['add_packet_us']
+        row[f'{kind}_packet_saving'] = (row[legacy] - row[current]) / before
+    logger.info(f"Packet id benchmark: {json.dumps(row)}")
+    return row
+
+def benchmark_windows(packet_count: int = 200_000) -> List[Dict[str, Any]]:
+    """
+    Cost of the window key per packet (formatted string against integer tuple), then
+    add_packet throughput, live fields and field memberships under each window policy.
+    """
+    packets = synthetic_wave_packets(packet_count)
+    start_time = time.time()
+    for i, packet in enumerate(packets):
+        packet.timestamp = start_time + i * 0.05  # About 2.8 hours of packets
+    
+    start = time.perf_counter()
+    for packet in packets:
+        f"{packet.field_type.value}_{int(packet.timestamp // FIELD_BUCKET_SECONDS)}"
+    string_key_us = (time.perf_counter() - start) / packet_count * 1e6
+    policy = TumblingWindows()
+    start = time.perf_counter()
+    for packet in packets:
+        policy.assign(FIELD_TYPE_CODES[packet.field_type], packet.timestamp)
+    tuple_key_us = (time.perf_counter() - start) / packet_count * 1e6
+    logger.info(f"Window key cost: string {string_key_us:.3f}us, tuple {tuple_key_us:.3f}us per packet")
+    
+    results = []
+    for spec in ("tumbling:300", "tumbling:60", "sliding:300/60", "session:30/300"):
+        ocean = IntelligenceOcean(windowing=FieldWindowing(parse_window_policy(spec)),
+                                  retention=RetentionPolicy(max_packets=None, max_graph_nodes=None))
+        start = time.perf_counter()
+        for packet in packets:
+            ocean.add_packet(packet)
+        elapsed = time.perf_counter() - start
+        row = {
+            'windows': spec,
+            'adds_per_second': packet_count / elapsed,
+            'live_fields': len(ocean.fields),
+            'finalized_windows': ocean.ocean_metrics['expired_fields'],
+            'live_packets': len(ocean.all_packets),
+            'memberships_per_packet': sum(len(f.packets) for f in ocean.fields.values()) / len(ocean.all_packets),
+            'string_key_us': string_key_us,
+            'tuple_key_us': tuple_key_us
+        }
+        ocean.shutdown()
+        results.append(row)
+        logger.info(f"Window benchmark: {json.dumps(row)}")
+    return results
+
+BENCHMARKS = {
+    'waves': benchmark_wave_engines,
+    'packet-memory': benchmark_packet_memory,
+    'ingest': benchmark_ingest,
+    'decode': benchmark_decode,
+    'routing': benchmark_routing,
+    'contention': benchmark_contention,
+    'journal': benchmark_journal,
+    'graph': benchmark_graph,
+    'packet-ids': benchmark_packet_ids,
+    'windows': benchmark_windows,
+}
 
 # ================== CLI Interface ==================
 
@@ -698,14 +4831,82 @@ async def main():
                        help='Log file to trail')
     parser.add_argument('--demo', action='store_true',
                        help='Run in demo mode with synthetic data')
+    parser.add_argument('--generate-load', action='store_true',
+                       help='Only append synthetic lines to --log-file (load generator mode)')
+    parser.add_argument('--rate', type=float, default=None,
+                       help='Synthetic lines per second (default 100000 with --generate-load, 10 in demo)')
+    parser.add_argument('--burst-profile', choices=SyntheticLoadGenerator.BURST_PROFILES,
+                       default='steady', help='Shape of the synthetic load over time')
+    parser.add_argument('--anomaly-rate', type=float, default=0.01,
+                       help='Fraction of synthetic lines carrying an anomaly')
+    parser.add_argument('--duration', type=float, default=None,
+                       help='Seconds to run the load generator (default: until interrupted)')
+    parser.add_argument('--json-backend', choices=JSON_BACKENDS,
+                       help='JSON decoder for log lines (default: fastest installed)')
+    parser.add_argument('--compact-packets', action='store_true',
+                       help='Keep packets in the columnar packet store')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                       help='Serve live metrics as server-sent events on this local port')
+    parser.add_argument('--journal-dir', default=None,
+                       help='Persist packets to an append-only journal here and replay it on start')
+    parser.add_argument('--window', action='append', default=[], metavar='[TYPE=]SPEC',
+                       help='Field windows: tumbling:SIZE, sliding:SIZE/SLIDE or session:GAP[/MAX] '
+                            'seconds, for all field types or one (e.g. security=session:30); repeatable')
+    parser.add_argument('--queue-size', type=int, default=0,
+                       help='Batches buffered between pipeline stages (default: 0, inline)')
+    parser.add_argument('--overflow-policy', choices=StageQueue.OVERFLOW_POLICIES, default='block',
+                       help='What a full pipeline does with new batches')
+    parser.add_argument('--shards', type=int, default=0,
+                       help='Worker processes for sharded ingestion (default: 0, in-process)')
+    parser.add_argument('--shard-key', choices=ShardPool.SHARD_KEYS, default='user',
+                       help='Log key that partitions lines across shards')
+    parser.add_argument('--self-check', action='store_true',
+                       help='Run built-in consistency checks and exit')
+    parser.add_argument('--benchmark', choices=sorted(BENCHMARKS),
+                       help='Run a micro-benchmark and exit')
+    parser.add_argument('--benchmark-size-mb', type=float, default=2048,
+                       help='Synthetic log size for the ingest benchmark')
     
     args = parser.parse_args()
+
+    if args.self_check:
+        raise SystemExit(0 if run_self_checks() else 1)
+    
+    if args.benchmark:
+        if args.benchmark == 'ingest':
+            await benchmark_ingest(size_mb=args.benchmark_size_mb, shards=args.shards)
+        elif asyncio.iscoroutinefunction(BENCHMARKS[args.benchmark]):
+            await BENCHMARKS[args.benchmark]()
+        else:
+            BENCHMARKS[args.benchmark]()
+        return
     
     if args.demo:
         # Use a temporary log file for demo
         args.log_file = 'demo-macagent.log'
     
-    sidecar = MacAgentSidecar(log_file=args.log_file)
+    if args.generate_load:
+        generator = SyntheticLoadGenerator(args.log_file, rate=args.rate or 100_000,
+                                           burst_profile=args.burst_profile,
+                                           anomaly_rate=args.anomaly_rate)
+        await generator.run(duration=args.duration)
+        return
+    
+    try:
+        windowing = FieldWindowing.from_specs(args.window)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    sidecar = MacAgentSidecar(log_file=args.log_file, compact_packets=args.compact_packets,
+                              json_backend=args.json_backend, shards=args.shards,
+                              shard_key=args.shard_key, queue_size=args.queue_size,
+                              overflow_policy=args.overflow_policy,
+                              metrics_port=args.metrics_port, journal_dir=args.journal_dir,
+                              windowing=windowing)
+    if args.demo:
+        sidecar.load_generator = SyntheticLoadGenerator(args.log_file, rate=args.rate or 10,
+                                                        burst_profile=args.burst_profile,
+                                                        anomaly_rate=args.anomaly_rate)
     
     print("""
     ╔══════════════════════════════════════════════════════════════╗